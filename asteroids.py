@@ -0,0 +1,137 @@
+"""Classical reference for the Week3 "false asteroids" boards.
+
+A board is a list of ``[row, column]`` pairs (strings, as in ``problem_set``).
+Every beam clears one whole row or column, so a board can be cleared with
+``nbeam`` beams iff its asteroids are covered by ``nbeam`` lines.
+
+Seen as a bipartite graph (rows on one side, columns on the other, one edge
+per asteroid), the fewest lines covering every asteroid is a minimum vertex
+cover, which by König's theorem is the size of a maximum matching: the most
+asteroids with no two in the same row or column. On a square board every
+matching extends to a permutation, so the maximum matching is the best
+``sum(grid[r, perm[r]])`` over the ``size!`` permutations (24 for 4x4). That
+is a handful of array operations over a whole batch of boards at once.
+
+Problem sets are parsed once into one integer mask per board (``encode``):
+bit ``row * size + column`` is set where there is an asteroid, a ``uint16``
+for the 4x4 boards. ``row_masks`` / ``column_masks`` slice it into one
+``size``-bit mask per line and ``grids`` unpacks it for ``max_matching``.
+``decode`` gives the string form back; it round-trips every board whose
+pairs are sorted and distinct, as in ``problem_set``.
+"""
+from itertools import permutations
+
+import numpy as np
+
+SIZE = 4
+NBEAM = 3
+
+
+def parse_board(board):
+    """``[['0', '2'], ...]`` -> sorted ``[(0, 2), ...]``."""
+    return sorted((int(r), int(c)) for r, c in board)
+
+
+def format_board(cells):
+    """Inverse of ``parse_board``."""
+    return [[str(r), str(c)] for r, c in sorted(cells)]
+
+
+def mask_dtype(size=SIZE):
+    """Smallest unsigned integer type holding one bit per cell."""
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        if(size * size <= np.iinfo(dtype).bits):
+            return dtype
+    raise ValueError('a {0}x{0} board does not fit a uint64 mask'.format(size))
+
+
+def encode(problem_set, size=SIZE):
+    """One occupancy mask per board of ``problem_set``, bit ``row * size + column``."""
+    try:
+        # boards with the same number of asteroids: one vectorized parse
+        cells = np.array(problem_set, dtype=np.int64)
+    except ValueError:
+        cells = None
+    if(cells is None or cells.ndim != 3 or cells.shape[2] != 2):
+        return np.array([int(encode([board], size)[0]) if len(board) else 0 for board in problem_set],
+                        dtype=mask_dtype(size))
+    if(((cells < 0) | (cells >= size)).any()):
+        raise ValueError('asteroid outside the {0}x{0} board'.format(size))
+    bits = np.uint64(1) << (cells[..., 0] * size + cells[..., 1]).astype(np.uint64)
+    return np.bitwise_or.reduce(bits, axis=1).astype(mask_dtype(size))
+
+
+def grids(masks, size=SIZE):
+    """Boolean ``(len(masks), size, size)`` occupancy of ``masks``."""
+    masks = np.asarray(masks).astype(np.uint64)
+    cells = np.arange(size * size, dtype=np.uint64)
+    return ((masks[:, None] >> cells) & np.uint64(1)).astype(bool).reshape(-1, size, size)
+
+
+def row_masks(masks, size=SIZE):
+    """``(len(masks), size)``: bit ``c`` of row ``r`` set if there is an asteroid at ``(r, c)``."""
+    masks = np.asarray(masks).astype(np.uint64)
+    shift = np.arange(size, dtype=np.uint64) * np.uint64(size)
+    return ((masks[:, None] >> shift) & np.uint64((1 << size) - 1)).astype(np.uint8 if size <= 8 else np.uint64)
+
+
+def column_masks(masks, size=SIZE):
+    """``(len(masks), size)``: bit ``r`` of column ``c`` set if there is an asteroid at ``(r, c)``."""
+    return row_masks(transpose(masks, size), size)
+
+
+def transpose(masks, size=SIZE):
+    """Masks of the boards mirrored on the diagonal (rows and columns swapped)."""
+    cells = grids(masks, size).transpose(0, 2, 1).reshape(-1, size * size)
+    weights = np.uint64(1) << np.arange(size * size, dtype=np.uint64)
+    return (cells * weights).sum(1, dtype=np.uint64).astype(mask_dtype(size))
+
+
+def decode(masks, size=SIZE):
+    """Inverse of ``encode``: the boards as sorted ``[['row', 'column'], ...]``."""
+    return [format_board(divmod(int(c), size) for c in np.flatnonzero(cells))
+            for cells in grids(masks, size).reshape(-1, size * size)]
+
+
+def occupancy(problem_set, size=SIZE):
+    """Boolean ``(len(problem_set), size, size)`` array, ``True`` where there is an asteroid."""
+    return grids(encode(problem_set, size), size)
+
+
+def max_matching(grids):
+    """Maximum matching of every ``(size, size)`` row/column graph in ``grids``."""
+    grids = np.asarray(grids, dtype=bool)
+    size = grids.shape[-1]
+    rows = np.arange(size)
+    best = np.zeros(grids.shape[:-2], dtype=np.int8)
+    for perm in permutations(range(size)):
+        np.maximum(best, grids[..., rows, perm].sum(-1, dtype=np.int8), out=best)
+    return best
+
+
+def mask_beams(masks, size=SIZE):
+    """Fewest beams clearing each board of ``encode``-d ``masks`` (König: = maximum matching)."""
+    return max_matching(grids(masks, size))
+
+
+def min_beams_many(problem_set, size=SIZE):
+    """Fewest beams clearing each board of ``problem_set``."""
+    return mask_beams(encode(problem_set, size), size)
+
+
+def min_beams(board, size=SIZE):
+    """Fewest beams clearing ``board``."""
+    return int(min_beams_many([board], size)[0])
+
+
+def clearable(board, nbeam=NBEAM, size=SIZE):
+    """Whether ``board`` can be cleared with at most ``nbeam`` beams."""
+    return min_beams(board, size) <= nbeam
+
+
+def false_board(problem_set, nbeam=NBEAM, size=SIZE):
+    """Index of the only board that cannot be cleared with ``nbeam`` beams."""
+    bad = np.flatnonzero(min_beams_many(problem_set, size) > nbeam)
+    if(len(bad) != 1):
+        raise ValueError('expected exactly one false board, found {}'.format(len(bad)))
+    return int(bad[0])
@@ -0,0 +1,195 @@
+"""Grover circuit builders for the Week3 asteroid boards.
+
+The oracle loads the occupancy of the addressed board into one qubit per
+cell (``qram``), flips the phase of the boards that need more than ``nbeam``
+beams and unloads the cells again. A board needs ``size`` beams iff some
+permutation ``perm`` has an asteroid on every ``(r, perm[r])`` (König, see
+``asteroids``), a monotone function of the cells. Its algebraic normal form
+is an XOR of cell products, so the phase ``(-1)**f`` is a product of
+multi-controlled Z gates on the cell qubits, with no ancilla.
+
+The full form has 7443 products, but a product of more than ``k`` cells is 0
+on every board with at most ``k`` asteroids: keeping the products up to
+degree ``k`` is exact under that promise. For the challenge's 6 asteroids
+that is the 24 permutations and the 72 unions of two permutations one
+transposition apart.
+
+The remaining choices are the loader, whether the phase is applied directly
+(``phase``) or kicked back from an oracle qubit in |-> (``oracle``), how many
+clean ancillas hold shared two-cell products (``nfactor``) and whether the
+multi-controlled gates may borrow busy qubits as dirty ancillas; see
+``oracle_search`` for the search over them.
+"""
+from collections import Counter
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit.library import RCCXGate
+
+from asteroids import NBEAM, SIZE, encode, grids, mask_beams
+from mcx_synth import auto_mcx
+from qram import load_gray, load_unary
+
+LOADERS = ('unary', 'gray')
+KICKBACKS = ('phase', 'oracle')
+
+
+@lru_cache(maxsize=None)
+def matching_terms(degree=None, nbeam=NBEAM, size=SIZE):
+    """Cell products (tuples of ``r * size + c``) of the phase polynomial.
+
+    XOR of the products is 1 iff the board needs more than ``nbeam`` beams,
+    for every board with at most ``degree`` asteroids (``None``: all boards).
+    """
+    ncell = size * size
+    if(ncell > 20):
+        raise ValueError('the truth table of a {0}x{0} board is too large'.format(size))
+    masks = np.arange(1 << ncell, dtype=np.uint64)
+    anf = (mask_beams(masks, size) > nbeam).astype(np.uint8)
+    # Moebius transform: truth table -> coefficient of every product
+    for i in range(ncell):
+        anf = anf.reshape(-1, 2, 1 << i)
+        anf[:, 1] ^= anf[:, 0]
+    terms = []
+    for mask in np.flatnonzero(anf.reshape(-1)):
+        cells = tuple(i for i in range(ncell) if mask >> i & 1)
+        if(degree is None or len(cells) <= degree):
+            terms.append(cells)
+    return tuple(sorted(terms, key=lambda t: (len(t), t)))
+
+
+def apply_terms(qc, terms, target=None, factor=(), clean=(), dirty=True):
+    """Phase ``(-1)**XOR(products)`` for ``terms`` (tuples of qubits).
+
+    ``target=None`` applies each product as a multi-controlled Z; otherwise
+    it is flipped onto ``target`` (an oracle qubit in |->). The pair of qubits
+    shared by most products is ANDed into the next ``factor`` ancilla with a
+    relative-phase Toffoli, the products containing it are applied with the
+    ancilla in place of the pair, and the ancilla is uncomputed; the phases of
+    RCCX cancel since only diagonal gates run in between. ``clean`` ancillas
+    (|0> here) and, with ``dirty``, every other qubit serve the MCX gates.
+    """
+    position = {q: i for i, q in enumerate(qc.qubits)}
+    terms = [tuple(t) for t in terms]
+    factor = list(factor)
+    # below this many qubits a product costs no more than the Toffoli pair
+    small = 3 if target is None else 2
+    while terms:
+        pairs = Counter(pair for t in terms if len(t) >= small for pair in combinations(t, 2))
+        best = max(pairs, key=lambda p: (pairs[p], [-position[q] for q in p]), default=None)
+        if(not factor or best is None or pairs[best] < 2):
+            break
+        anc = factor[0]
+        group = [tuple(q for q in t if q not in best) + (anc,) for t in terms if set(best) <= set(t)]
+        terms = [t for t in terms if not set(best) <= set(t)]
+        qc.append(RCCXGate(), [best[0], best[1], anc])
+        apply_terms(qc, group, target, factor[1:], [q for q in clean if q != anc], dirty)
+        qc.append(RCCXGate().inverse(), [best[0], best[1], anc])
+    for t in terms:
+        if(target is None):
+            phase_flip(qc, t, clean, dirty)
+        else:
+            auto_mcx(qc, t, target, clean=clean, dirty=None if dirty else ())
+
+
+def phase_flip(qc, qubits, clean=(), dirty=True):
+    """Phase -1 on the state where every qubit in ``qubits`` is 1.
+
+    ``dirty=False`` keeps the MCX from borrowing busy qubits as ancillas.
+    """
+    if(len(qubits) == 1):
+        qc.z(qubits[0])
+    else:
+        qc.h(qubits[-1])
+        auto_mcx(qc, qubits[:-1], qubits[-1], clean=clean, dirty=None if dirty else ())
+        qc.h(qubits[-1])
+
+
+def load_cells(qc, loader, r_address, r_cells, table, ancilla):
+    """XOR the occupancy row ``table[a]`` into ``r_cells`` for address ``a``."""
+    if(loader == 'unary'):
+        load_unary(qc, r_address, r_cells, table, ancilla)
+    elif(loader == 'gray'):
+        mode = 'v-chain' if len(ancilla) >= len(r_address) - 2 else 'noancilla'
+        load_gray(qc, r_address, r_cells, table, list(ancilla) or None, mode)
+    else:
+        raise ValueError('unknown loader {!r}'.format(loader))
+
+
+def loader_ancillas(loader, naddress):
+    """Clean ancillas ``loader`` needs for ``naddress`` address qubits."""
+    return max(0, naddress - 1) if loader == 'unary' else 0
+
+
+def week3_registers(naddress, kickback='phase', nancilla=0, size=SIZE):
+    """Empty Week3 circuit; returns ``(qc, r_address, r_cells, target, ancilla)``.
+
+    ``target`` is the oracle qubit (``None`` for ``phase``), ``ancilla`` a list.
+    """
+    if(kickback not in KICKBACKS):
+        raise ValueError('unknown kickback {!r}'.format(kickback))
+    r_address = QuantumRegister(naddress, 'address')
+    r_cells = QuantumRegister(size * size, 'cells')
+    regs = [r_address, r_cells]
+    if(kickback == 'oracle'):
+        r_oracle = QuantumRegister(1, 'oracle')
+        regs.append(r_oracle)
+    if(nancilla):
+        r_ancilla = QuantumRegister(nancilla, 'ancilla')
+        regs.append(r_ancilla)
+    qc = QuantumCircuit(*regs, ClassicalRegister(naddress, 'c'))
+    target = r_oracle[0] if kickback == 'oracle' else None
+    return qc, r_address, r_cells, target, list(r_ancilla) if nancilla else []
+
+
+def week3_table(problem_set, size=SIZE):
+    """qRAM rows: the ``size * size`` occupancy bits of every board."""
+    return grids(encode(problem_set, size), size).reshape(len(problem_set), -1).astype(int).tolist()
+
+
+def build_week3(problem_set, loader='unary', degree=6, kickback='phase', nfactor=0, nancilla=None,
+                dirty=True, nbeam=NBEAM, size=SIZE):
+    """One-iteration Grover circuit finding the board of ``problem_set`` that needs more than ``nbeam`` beams.
+
+    ``nancilla`` clean ancillas (default: as many as the loader and the
+    factoring need) are shared by the loader, ``nfactor`` product ancillas and
+    the MCX gates. Only the address is measured, ``c[0]`` the highest bit.
+    """
+    naddress = max(1, int(np.ceil(np.log2(len(problem_set)))))
+    if(nancilla is None):
+        nancilla = max(loader_ancillas(loader, naddress), nfactor)
+    if(nancilla < loader_ancillas(loader, naddress) or nancilla < nfactor):
+        raise ValueError('{} ancillas do not fit loader {!r} and {} factors'.format(nancilla, loader, nfactor))
+    table = week3_table(problem_set, size)
+    qc, r_address, r_cells, target, ancilla = week3_registers(naddress, kickback, nancilla, size)
+
+    qc.h(r_address)
+    if(target is not None):
+        qc.x(target)
+        qc.h(target)
+    qc.barrier()
+
+    ### Oracle ###
+    load_cells(qc, loader, r_address, r_cells, table, ancilla)
+    qc.barrier()
+    terms = [[r_cells[i] for i in t] for t in matching_terms(degree, nbeam, size)]
+    apply_terms(qc, terms, target, ancilla[:nfactor], ancilla, dirty)
+    qc.barrier()
+    load_cells(qc, loader, r_address, r_cells, table, ancilla)
+    qc.barrier()
+    if(target is not None):
+        qc.h(target)
+        qc.x(target)
+    ##############
+
+    qc.h(r_address)
+    qc.x(r_address)
+    phase_flip(qc, r_address, clean=ancilla, dirty=dirty)
+    qc.x(r_address)
+    qc.h(r_address)
+    qc.barrier()
+    qc.measure(r_address[::-1], qc.cregs[0])
+
+    return qc
@@ -0,0 +1,96 @@
+"""Board topologies for Lights Out.
+
+A ``Board`` is the closed neighbourhood of every light: pushing switch ``i``
+toggles ``push[i]``. Boards are built once per topology and memoized, and carry
+the same adjacency in the three layouts the rest of the code wants:
+
+- ``push``: list of neighbour lists, as the Week2 circuit builders use;
+- ``indptr`` / ``indices``: CSR arrays for vectorized NumPy code;
+- ``masks``: one ``uint64`` bitmask per switch (lights it toggles), and
+  ``rows``: one per light (switches that toggle it), for the GF(2) solver.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+class Board:
+    """Lights Out topology on ``nlight`` lights."""
+
+    def __init__(self, nlight, push, name='', shape=None, torus=False):
+        self.nlight = nlight
+        self.push = [list(p) for p in push]
+        self.name = name
+        # (nrow, ncol) for grid boards, ``None`` for arbitrary graphs.
+        self.shape = shape
+        self.torus = torus
+        self.indptr = np.cumsum([0] + [len(p) for p in self.push])
+        self.indices = np.array([j for p in self.push for j in p], dtype=np.intp)
+        if(nlight <= 64):
+            self.masks = np.zeros(nlight, dtype=np.uint64)
+            self.rows = np.zeros(nlight, dtype=np.uint64)
+            for i, p in enumerate(self.push):
+                for j in p:
+                    self.masks[i] |= np.uint64(1 << j)
+                    self.rows[j] |= np.uint64(1 << i)
+        else:
+            self.masks = self.rows = None
+
+    def __repr__(self):
+        return 'Board({!r}, nlight={})'.format(self.name, self.nlight)
+
+
+@lru_cache(maxsize=None)
+def grid(nrow, ncol, torus=False):
+    """``nrow`` x ``ncol`` grid, lights numbered row by row.
+
+    With ``torus=True`` the edges wrap around. A neighbour reached twice (2-wide
+    torus) is toggled once.
+    """
+    nlight = nrow * ncol
+    push = [[] for _ in range(nlight)]
+    for i in range(nlight):
+        r, c = divmod(i, ncol)
+        cand = [i]
+        if(c > 0 or torus):
+            cand.append(r * ncol + (c - 1) % ncol)
+        if(c < ncol - 1 or torus):
+            cand.append(r * ncol + (c + 1) % ncol)
+        if(r > 0 or torus):
+            cand.append(((r - 1) % nrow) * ncol + c)
+        if(r < nrow - 1 or torus):
+            cand.append(((r + 1) % nrow) * ncol + c)
+        for j in cand:
+            if(j not in push[i]):
+                push[i].append(j)
+    name = '{}x{}{}'.format(nrow, ncol, ' torus' if torus else '')
+    return Board(nlight, push, name, (nrow, ncol), torus)
+
+
+def square(nlight):
+    """Square board with ``nlight`` lights, as assumed by ``week2a_ans_func``."""
+    size = int(np.sqrt(nlight))
+    if(size * size != nlight):
+        raise ValueError('{} lights do not form a square board'.format(nlight))
+    return grid(size, size)
+
+
+@lru_cache(maxsize=None)
+def _from_edges(nlight, edges):
+    push = [[i] for i in range(nlight)]
+    for a, b in edges:
+        if(b not in push[a]):
+            push[a].append(b)
+        if(a not in push[b]):
+            push[b].append(a)
+    return Board(nlight, push, 'graph')
+
+
+def from_edges(nlight, edges):
+    """Board on an arbitrary undirected graph given as ``(a, b)`` pairs."""
+    return _from_edges(nlight, tuple(sorted((min(a, b), max(a, b)) for a, b in edges)))
+
+
+def as_board(board):
+    """Accept either a ``Board`` or a light count of a square board."""
+    return board if isinstance(board, Board) else square(int(board))
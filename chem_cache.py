@@ -0,0 +1,131 @@
+"""Content-addressed on-disk cache of the chemistry stages of ``lih_sweep``.
+
+Every run of the LiH sweep repeats the PySCF SCF (``PySCFDriver.run``) and
+the qubit mapping (``Hamiltonian.run``) for the same geometries and options.
+Both are cached under the SHA-256 of their inputs:
+
+- ``molecule``: key = atom string, basis and the qiskit-aqua version; the
+  ``QMolecule`` integrals are stored with ``QMolecule.save`` (HDF5);
+- ``hamiltonian``: key = molecule key and the ``Hamiltonian`` options
+  (mapping, two-qubit reduction, frozen core, orbital reduction); stores
+  ``qubit_op`` and ``aux_ops`` as packed Pauli bits and complex coefficients
+  (``operators.npz``) and the mapped ``Hamiltonian`` itself (``core.pkl``,
+  a few shifts and ``molecule_info``), which
+  ``process_algorithm_result`` needs.
+
+A parameter study that only changes the mapping options reuses the integrals;
+a rerun skips both stages. Entries are written to a temporary name and then
+renamed, so workers of a pool can fill the cache concurrently.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+from qiskit.aqua import __version__ as aqua_version
+from qiskit.aqua.operators import WeightedPauliOperator
+from qiskit.chemistry import QMolecule
+from qiskit.chemistry.core import Hamiltonian
+from qiskit.chemistry.drivers import PySCFDriver
+from qiskit.quantum_info import Pauli
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chem_cache')
+
+
+def digest(fields):
+    """SHA-256 of ``fields`` as canonical JSON (enums by value)."""
+    text = json.dumps(fields, sort_keys=True, default=lambda v: getattr(v, 'value', str(v)))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def entry(cache_dir, key):
+    """Directory of the entry ``key``."""
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def write_atomic(path, write):
+    """``write(tmp_path)``, then rename to ``path``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def operator_arrays(op, prefix):
+    """``{name: array}`` of a ``WeightedPauliOperator`` (``None`` kept as absent)."""
+    if(op is None):
+        return {prefix + 'none': np.ones(1, dtype=bool)}
+    paulis = op.paulis
+    nqubit = op.num_qubits
+    z = np.array([p.z for _, p in paulis], dtype=bool).reshape(len(paulis), nqubit)
+    x = np.array([p.x for _, p in paulis], dtype=bool).reshape(len(paulis), nqubit)
+    return {
+        prefix + 'z': np.packbits(z, axis=1),
+        prefix + 'x': np.packbits(x, axis=1),
+        prefix + 'coeff': np.array([c for c, _ in paulis], dtype=complex),
+        prefix + 'nqubit': np.array(nqubit),
+    }
+
+
+def operator_from_arrays(arrays, prefix):
+    """Inverse of ``operator_arrays``."""
+    if(prefix + 'none' in arrays):
+        return None
+    nqubit = int(arrays[prefix + 'nqubit'])
+    z = np.unpackbits(arrays[prefix + 'z'], axis=1, count=nqubit).astype(bool)
+    x = np.unpackbits(arrays[prefix + 'x'], axis=1, count=nqubit).astype(bool)
+    coeffs = arrays[prefix + 'coeff']
+    return WeightedPauliOperator(paulis=[[c, Pauli(z=zi, x=xi)] for c, zi, xi in zip(coeffs, z, x)])
+
+
+def molecule_key(atom, basis):
+    return digest({'atom': atom, 'basis': basis, 'aqua': aqua_version})
+
+
+def molecule(atom, basis, cache_dir=CACHE_DIR):
+    """``PySCFDriver(atom, basis=basis).run()``, from the cache if it was run before."""
+    path = os.path.join(entry(cache_dir, molecule_key(atom, basis)), 'qmolecule.hdf5')
+    if(os.path.exists(path)):
+        qmolecule = QMolecule(path)
+        qmolecule.load()
+        return qmolecule
+    qmolecule = PySCFDriver(atom, basis=basis).run()
+    write_atomic(path, qmolecule.save)
+    return qmolecule
+
+
+def hamiltonian(atom, basis, cache_dir=CACHE_DIR, **options):
+    """``(operator, qubit_op, aux_ops)`` of ``Hamiltonian(**options).run(molecule(atom, basis))``, cached."""
+    key = digest({'molecule': molecule_key(atom, basis), 'options': options})
+    path = entry(cache_dir, key)
+    core_path = os.path.join(path, 'core.pkl')
+    ops_path = os.path.join(path, 'operators.npz')
+    if(os.path.exists(core_path) and os.path.exists(ops_path)):
+        with open(core_path, 'rb') as f:
+            operator = pickle.load(f)
+        with np.load(ops_path) as arrays:
+            naux = int(arrays['naux'])
+            qubit_op = operator_from_arrays(arrays, 'op_')
+            aux_ops = [operator_from_arrays(arrays, 'aux{}_'.format(i)) for i in range(naux)]
+        return operator, qubit_op, aux_ops
+
+    operator = Hamiltonian(**options)
+    qubit_op, aux_ops = operator.run(molecule(atom, basis, cache_dir))
+    arrays = operator_arrays(qubit_op, 'op_')
+    for i, op in enumerate(aux_ops):
+        arrays.update(operator_arrays(op, 'aux{}_'.format(i)))
+    arrays['naux'] = np.array(len(aux_ops))
+
+    def save_operators(tmp):
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    def save_core(tmp):
+        with open(tmp, 'wb') as f:
+            pickle.dump(operator, f)
+
+    # operators first: an entry counts as present once core.pkl exists
+    write_atomic(ops_path, save_operators)
+    write_atomic(core_path, save_core)
+    return operator, qubit_op, aux_ops
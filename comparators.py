@@ -0,0 +1,168 @@
+"""Popcount and "k of n" predicate circuits.
+
+``week2b_ans_func`` counts pushes with a hand-built binary counter on
+``r_ancilla[0:4]`` and then flags 1, 2 or 3 pushes with three masked ``mcx``.
+This module does the same for any input register and any set of counts:
+
+- ``ripple``: binary counter, one controlled increment per input (the week2b
+  construction, skipping count bits that cannot be reached yet);
+- ``sideways``: carry-save sideways addition, a tree of full/half adders built
+  from CCX/CX that leaves the count spread over inputs and carry ancillas.
+
+The predicate ``target ^= [popcount(inputs) in values]`` is read off the
+count bits with one multi-controlled X per sub-cube of ``values`` and the
+count is then uncomputed, so inputs and ancillas come back unchanged. Costs
+are exact (counted once per shape and memoized) and available before
+touching the caller's circuit, so the cheapest construction for an ancilla
+budget can be picked up front.
+"""
+from functools import lru_cache
+
+from qiskit import QuantumCircuit, QuantumRegister
+
+from mcx_synth import auto_mcx
+from qcost import analytic_counts
+from qram import address_cubes
+
+
+def ripple_popcount(qc, inputs, ancilla):
+    """Binary count of ``inputs`` in ``ancilla[:width]``; returns the count bits."""
+    width = len(inputs).bit_length()
+    count = list(ancilla[:width])
+    free = list(ancilla[width:])
+    for t, q in enumerate(inputs):
+        # after this input the count is at most t + 1
+        for j in reversed(range((t + 1).bit_length())):
+            auto_mcx(qc, [q] + count[:j], count[j], clean=free, dirty=())
+    return count
+
+
+def sideways_popcount(qc, inputs, ancilla):
+    """Carry-save popcount; returns the count bits by weight (``None`` if always 0).
+
+    Full adder on ``a, b, c`` with carry ancilla ``k``: CCX(a,b,k) CX(a,b)
+    CCX(b,c,k) CX(b,c) leaves the sum in ``c``. A half adder is the first two
+    gates.
+    """
+    ancilla = list(ancilla)
+    buckets = [list(inputs)]
+    w = 0
+    while w < len(buckets):
+        bits = buckets[w]
+        while len(bits) > 1:
+            if(not ancilla):
+                raise ValueError('sideways popcount ran out of ancillas')
+            carry = ancilla.pop(0)
+            if(len(bits) >= 3):
+                a, b, c = bits.pop(0), bits.pop(0), bits.pop(0)
+                qc.ccx(a, b, carry)
+                qc.cx(a, b)
+                qc.ccx(b, c, carry)
+                qc.cx(b, c)
+                bits.append(c)
+            else:
+                a, b = bits.pop(0), bits.pop(0)
+                qc.ccx(a, b, carry)
+                qc.cx(a, b)
+                bits.append(b)
+            if(w + 1 == len(buckets)):
+                buckets.append([])
+            buckets[w + 1].append(carry)
+        w += 1
+    return [bits[0] if bits else None for bits in buckets]
+
+
+CONSTRUCTIONS = {
+    'ripple': ripple_popcount,
+    'sideways': sideways_popcount,
+}
+
+
+def popcount_ancillas(construction, n):
+    """Ancillas ``construction`` needs to hold the count of ``n`` inputs."""
+    if(construction == 'ripple'):
+        return n.bit_length()
+    # one carry per adder: every full adder removes a bit, a half adder moves one up
+    count = 0
+    buckets = [n]
+    w = 0
+    while w < len(buckets):
+        while buckets[w] > 1:
+            count += 1
+            buckets[w] -= 2 if buckets[w] >= 3 else 1
+            if(w + 1 == len(buckets)):
+                buckets.append(0)
+            buckets[w + 1] += 1
+        w += 1
+    return count
+
+
+def count_predicate(qc, inputs, target, values, ancilla, construction=None):
+    """``target ^= [popcount(inputs) in values]``; inputs and ancillas are restored.
+
+    ``construction=None`` picks the cheapest one that fits in ``ancilla``.
+    """
+    inputs = list(inputs)
+    ancilla = list(ancilla)
+    values = sorted(set(v for v in values if 0 <= v <= len(inputs)))
+    if(construction is None):
+        construction = cheapest(len(inputs), tuple(values), len(ancilla))[0]
+    nanc = popcount_ancillas(construction, len(inputs))
+    if(nanc > len(ancilla)):
+        raise ValueError('{} popcount of {} inputs needs {} ancillas, {} given'.format(
+            construction, len(inputs), nanc, len(ancilla)))
+
+    counter = QuantumCircuit(*qc.qregs)
+    count = CONSTRUCTIONS[construction](counter, inputs, ancilla)
+    free = ancilla[nanc:]
+    qc.extend(counter)
+    qc.barrier()
+    for care, value in address_cubes(values, len(count)):
+        if(any(count[b] is None and value >> b & 1 for b in range(len(count)))):
+            continue
+        bits = [b for b in range(len(count)) if care >> b & 1 and count[b] is not None]
+        zeros = [count[b] for b in bits if not value >> b & 1]
+        if(zeros):
+            qc.x(zeros)
+        auto_mcx(qc, [count[b] for b in bits], target, clean=free, dirty=())
+        if(zeros):
+            qc.x(zeros)
+    qc.barrier()
+    qc.extend(counter.inverse())
+
+
+def at_most(qc, inputs, target, k, ancilla, construction=None):
+    """``target ^= [popcount(inputs) <= k]``."""
+    count_predicate(qc, inputs, target, range(k + 1), ancilla, construction)
+
+
+def in_range(qc, inputs, target, lo, hi, ancilla, construction=None):
+    """``target ^= [lo <= popcount(inputs) <= hi]``."""
+    count_predicate(qc, inputs, target, range(lo, hi + 1), ancilla, construction)
+
+
+@lru_cache(maxsize=None)
+def predicate_cost(construction, n, values, nancilla):
+    """Exact ``(n_u3, n_cx)`` of ``count_predicate`` for ``n`` inputs and ``nancilla`` ancillas.
+
+    ``None`` if the construction does not fit the ancilla budget.
+    """
+    if(popcount_ancillas(construction, n) > nancilla):
+        return None
+    r_in = QuantumRegister(n, 'in')
+    r_target = QuantumRegister(1, 'target')
+    r_anc = QuantumRegister(nancilla, 'ancilla') if nancilla else None
+    regs = [r for r in (r_in, r_target, r_anc) if r is not None]
+    qc = QuantumCircuit(*regs)
+    count_predicate(qc, r_in, r_target[0], values, list(r_anc) if r_anc else [], construction)
+    return analytic_counts(qc)
+
+
+def cheapest(n, values, nancilla):
+    """``(construction, (n_u3, n_cx))`` with the lowest cost that fits the budget."""
+    values = tuple(sorted(set(values)))
+    options = [(name, predicate_cost(name, n, values, nancilla)) for name in CONSTRUCTIONS]
+    options = [(name, c) for name, c in options if c is not None]
+    if(not options):
+        raise ValueError('no popcount construction for {} inputs fits {} ancillas'.format(n, nancilla))
+    return min(options, key=lambda o: o[1][0] + 10 * o[1][1])
@@ -109,52 +109,29 @@ vqe_energies = []
 hf_energies = []
 exact_energies = []
 # %%
-for i, d in enumerate(distances):
-    print('step', i)
-
-    # set up experiment:
-    driver = PySCFDriver(molecule.format(d/2), basis='sto3g')
-    qmolecule = driver.run()
-    operator = Hamiltonian(qubit_mapping=QubitMappingType.PARITY,
-                           two_qubit_reduction=True, 
-                           freeze_core=True,
-                           orbital_reduction=[-3, -2])
-    qubit_op, aux_ops = operator.run(qmolecule)
-
-    # exact classical result
-    # exact_result = NumPyMinimumEigensolver(qubit_op, aux_operators=aux_ops).run()
-    exact_result = NumPyMinimumEigensolver(qubit_op, aux_operators=aux_ops).compute_minimum_eigenvalue()
-
-    exact_result = operator.process_algorithm_result(exact_result)
-
-    # VQE
-    optimzer = SLSQP(maxiter=1000)
-    initial_state = HartreeFock(operator.molecule_info['num_orbitals'],
-                                 operator.molecule_info['num_particles'],
-                                 qubit_mapping=operator._qubit_mapping,
-                                 two_qubit_reduction=operator._two_qubit_reduction)
-    var_form = UCCSD(num_orbitals=operator.molecule_info['num_orbitals'],
-                     num_particles=operator.molecule_info['num_particles'],
-                     initial_state=initial_state,
-                     qubit_mapping=operator._qubit_mapping,
-                     two_qubit_reduction=operator._two_qubit_reduction)
-    algo = VQE(qubit_op, var_form, optimzer, aux_operators=aux_ops)
-
-    vqe_result = algo.run(QuantumInstance(BasicAer.get_backend('statevector_simulator')))
-    vqe_result = operator.process_algorithm_result(vqe_result)
-
-    exact_energies.append(exact_result.energy)
-    vqe_energies.append(vqe_result.energy)
-    hf_energies.append(vqe_result.hartree_fock_energy)
+# The geometries are independent: one per process, each capped at `threads` BLAS/OpenMP threads
+# (workers * threads = cores). The serial loop took hours.
+# warm_start: a geometry starts VQE from the converged point of its nearest finished neighbour.
+# SCF integrals and qubit operators are cached in .chem_cache (chem_cache.py): reruns skip both stages.
+# Each finished geometry is appended to lih_results.jsonl at once; after a restart only the missing
+# distances are solved again.
+# adaptive_sweep starts from a 0.5 A grid and only adds geometries in the well until the equilibrium
+# distance (0.01 A) and the well depth (1.6 mHa) converge; sweep(distances, ...) solves the full grid.
+from lih_sweep import adaptive_sweep, warm_start_savings
+results_file = 'lih_results.jsonl'
+adaptive = adaptive_sweep(distances[0], distances[-1], 0.5, threads=1, warm_start=True, extrapolate=True,
+                          store=results_file)
+points = adaptive['points']
+print('{} geometries, r_eq = {:.3f} A, well depth = {:.4f} Ha'.format(len(points), adaptive['r_eq'],
+                                                                       adaptive['depth']))
+print(warm_start_savings(points))
 
 # %%
-# Cell above takes hours to generate the arrays below. 
-# print(vqe_energies)
-# [-7.039732392758102, -7.571892648232261, -7.782242393472553, -7.8602117471410775, -7.881015701737517, -7.876063064463558, -7.860153185774109, -7.841042349668195, -7.823076363165138, -7.8086123594080705, -7.798363283916963, -7.791753027217073, -7.78771682817007, -7.785319601540412, -7.783918289419224]
-# print(hf_energies)
-# [-7.02841009454194, -7.556721660246124, -7.767362135748564, -7.844905315573962, -7.863357621535116, -7.853839601840507, -7.830905584637074, -7.801938957048707, -7.770873669221911, -7.740000740013314, -7.710829900217224, -7.684376423067878, -7.661201601515233, -7.641453865325337, -7.624975630131314]
-# print(exact_energies)
-# [-7.039732521635205, -7.571892675243001, -7.782242402637011, -7.860211753123078, -7.881015715646996, -7.876063072528085, -7.860153207378774, -7.841042712184118, -7.8230766421340965, -7.808612396387237, -7.7983634309151295, -7.791753253612651, -7.787716973466147, -7.785319717061217, -7.783918466113922]
+# Plot from the results file: no need to rerun the sweep after a kernel restart.
+from lih_sweep import curves, load_results, sweep_settings
+stored = load_results(results_file, sweep_settings(warm_start=True, extrapolate=True))
+distances = [p['distance'] for p in stored]
+exact_energies, vqe_energies, hf_energies = curves(stored)
 pylab.plot(distances, hf_energies, label='Hartree-Fock')
 pylab.plot(distances, vqe_energies, 'o', label='VQE')
 pylab.plot(distances, exact_energies, 'r', label='Exact')
@@ -0,0 +1,77 @@
+"""Fuzz the answer functions with random inputs of the kind the grader uses.
+
+The notebooks warn that circuits are validated "with different inputs", but
+each answer function only ever ran on the sample input. ``fuzz`` draws
+``ninput`` random inputs with the exercise's promise (``problems``), builds
+and samples every circuit on all cores (``local_grader.run_many``) and
+summarizes:
+
+- failure rate: wrong top answer, exception, or over the qubit limit;
+- margin: top count minus runner-up count, as a fraction of the shots (the
+  smaller, the closer a different seed or noise is to a wrong answer);
+- cost: distribution of ``u3 + 10 * cx`` over the inputs.
+"""
+import numpy as np
+
+from local_grader import MAX_QUBITS, SHOTS, run_many, top_key
+from problems import random_ex2a, random_ex2b, random_ex3
+
+# a quick check; a full run (``ninput=1000``) of ex2b simulates for about 12 minutes on one core
+NINPUT = 20
+GENERATORS = {
+    'ex2a': random_ex2a,
+    'ex2b': random_ex2b,
+    'ex3': random_ex3,
+}
+
+
+def margin(counts, shots):
+    """(top - runner-up) / shots; 1 if only one key was seen, 0 without counts."""
+    ranked = sorted(counts.values(), reverse=True) + [0, 0]
+    return (ranked[0] - ranked[1]) / shots
+
+
+def fuzz(exercise, ans_func, ninput=NINPUT, seed=None, workers=None, shots=SHOTS, max_qubits=MAX_QUBITS):
+    """Run ``ans_func`` on ``ninput`` random inputs for ``exercise`` ('ex2a', 'ex2b' or 'ex3').
+
+    Returns a dict with the per-input ``runs`` and ``inputs``, the indices of
+    ``failures`` and the summary statistics printed by ``report``.
+    """
+    rng = np.random.default_rng(seed)
+    inputs, answers = zip(*(GENERATORS[exercise](rng) for _ in range(ninput)))
+    runs = run_many(ans_func, list(inputs), shots, seed, workers)
+
+    failures = []
+    for i, (run, ok) in enumerate(zip(runs, answers)):
+        if(run['error'] or run['nqubit'] > max_qubits or top_key(run['counts']) not in ok):
+            failures.append(i)
+    margins = np.array([margin(run['counts'], shots) for run in runs if not run['error']])
+    costs = np.array([run['cost'] for run in runs if not run['error']])
+    return {
+        'exercise': exercise,
+        'inputs': list(inputs),
+        'answers': list(answers),
+        'runs': runs,
+        'failures': failures,
+        'failure_rate': len(failures) / ninput,
+        'errors': sum(1 for run in runs if run['error']),
+        'margin': margins,
+        'cost': costs,
+    }
+
+
+def report(result):
+    """Text summary of a ``fuzz`` result."""
+    n = len(result['runs'])
+    lines = ['{}: {} inputs, {} failed ({:.2%}), {} raised'.format(
+        result['exercise'], n, len(result['failures']), result['failure_rate'], result['errors'])]
+    for name, values, fmt in (('margin', result['margin'], '{:.3f}'), ('cost', result['cost'], '{:.0f}')):
+        if(len(values)):
+            q = np.percentile(values, [0, 5, 50, 95, 100])
+            lines.append('{:<7} min {}  p5 {}  median {}  p95 {}  max {}'.format(
+                name, *(fmt.format(v) for v in q)))
+    for i in result['failures'][:3]:
+        run = result['runs'][i]
+        got = run['error'] or top_key(run['counts'])
+        lines.append('  input {}: got {!r}, expected {}'.format(i, got, ' or '.join(sorted(result['answers'][i]))))
+    return '\n'.join(lines)
@@ -0,0 +1,67 @@
+"""Grover iteration planning from the number of marked states.
+
+``week2a_ans_func`` and ``week2b_ans_func`` used to derive ``nit`` assuming a
+single marked state, and week2b then hardcoded it. Here the success
+probability ``sin((2k+1) theta)**2`` with ``sin(theta)**2 = M/N`` is weighed
+against the cost of ``k`` oracle + diffusion rounds, and the iteration count
+with the best success per unit of cost is returned.
+
+``M`` comes exactly from the GF(2) kernel of the toggle matrix (every
+solvable board has ``2**dim(kernel)`` solutions).
+"""
+import numpy as np
+
+from lightsout import get_solver
+
+
+def grover_angle(nsearch, nmarked):
+    """``theta`` with ``sin(theta)**2 = nmarked / nsearch``."""
+    return np.arcsin(np.sqrt(nmarked / nsearch))
+
+
+def success_probability(k, nsearch, nmarked):
+    """Probability of measuring a marked state after ``k`` Grover iterations."""
+    return np.sin((2 * np.asarray(k) + 1) * grover_angle(nsearch, nmarked)) ** 2
+
+
+def plan_from_success(success, kmax, iteration_cost=1.0, base_cost=0.0, min_success=0.0):
+    """Pick ``k`` in ``1..kmax`` maximizing ``success(k) / (base_cost + k * iteration_cost)``.
+
+    ``success`` maps an array of iteration counts to success probabilities.
+    Counts below ``min_success`` are skipped unless none reaches it, in which
+    case the most successful count is returned. ``k = 0`` (no search at all) is
+    never returned.
+    """
+    ks = np.arange(1, kmax + 1)
+    p = np.asarray(success(ks), dtype=float)
+    ok = p >= min_success
+    if(not ok.any()):
+        return int(ks[np.argmax(p)])
+    score = np.where(ok, p / (base_cost + ks * iteration_cost), -np.inf)
+    return int(ks[np.argmax(score)])
+
+
+def optimal_iterations(nsearch, nmarked):
+    """Iteration count maximizing the success probability alone."""
+    if(nmarked <= 0 or nmarked >= nsearch):
+        return 0
+    return int(np.floor(np.pi / (4 * grover_angle(nsearch, nmarked))))
+
+
+def plan_iterations(nsearch, nmarked, iteration_cost=1.0, base_cost=0.0, min_success=0.0):
+    """Cost-aware iteration count for ``nmarked`` marked states out of ``nsearch``.
+
+    Never goes past the success maximum: beyond it every extra round costs
+    more and succeeds less.
+    """
+    if(nmarked <= 0 or nmarked >= nsearch):
+        return 0
+    kmax = optimal_iterations(nsearch, nmarked) + 1
+    return plan_from_success(lambda k: success_probability(k, nsearch, nmarked),
+                             kmax, iteration_cost, base_cost, min_success)
+
+
+def lightsout_marked_count(board):
+    """Number of push patterns solving any solvable ``board`` (or square board of that size)."""
+    return get_solver(board).nsolution
+
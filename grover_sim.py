@@ -0,0 +1,258 @@
+"""Search-register-only simulation of the Week2 Grover circuits.
+
+In ``week2a_ans_func`` and ``week2b_ans_func`` every helper register
+(``is_off``, ``oracle``, ``ancilla``) is computed reversibly from the search
+register and uncomputed again inside the oracle, so the whole oracle block acts
+as a diagonal +/-1 phase on the search amplitudes and the diffusion is a
+reflection about the mean. Tracking only those ``2**n`` amplitudes (times the
+address register for Week2-B) gives the measured distribution of the full
+circuit, in microseconds and kilobytes instead of a 19-28 qubit statevector.
+These functions model the algorithm and never read a circuit; they take the
+iteration count and the push range from the same place as the builders.
+
+``grover_sweep`` runs the same update one round at a time and records the
+exact success probability after every round, which is what the Week1-B
+iteration experiment measures by rebuilding and sampling a circuit per count.
+
+Amplitude index ``x`` is the push bitmask, bit ``i`` = ``is_push[i]``; see
+``to_bitstring`` for the matching measured bit string.
+"""
+from functools import lru_cache
+from math import erfc, sqrt
+
+import numpy as np
+
+from board import as_board
+from grover_planner import lightsout_marked_count, optimal_iterations, plan_from_success, plan_iterations
+from lightsout import parity, to_masks
+
+# push counts week2b_ans_func's oracle accepts (in_range on is_push)
+WEEK2B_MIN_PUSH = 1
+WEEK2B_MAX_PUSH = 3
+# u3 + 10 cx of week2b_ans_func on the sample boards: 6963 with one push round, 10507 with two
+WEEK2B_ROUND_COST = 3544
+WEEK2B_BASE_COST = 3419
+
+
+def grover_iterate(state, phase, nit):
+    """Apply ``nit`` rounds of oracle ``phase`` (+/-1 array) and diffusion.
+
+    ``state`` and ``phase`` may carry leading batch axes; the search index is the
+    last axis. The global sign of the diffusion is dropped, it has no effect on
+    measured probabilities.
+    """
+    state = np.array(state, dtype=complex)
+    for _ in range(nit):
+        state *= phase
+        state = 2 * state.mean(axis=-1, keepdims=True) - state
+    return state
+
+
+def grover_steps(state, phase):
+    """Yield the state after 1, 2, ... rounds of oracle ``phase`` and diffusion.
+
+    Same update as ``grover_iterate``, in place on a private copy, so a sweep
+    over ``k`` rounds costs ``k`` updates instead of ``k**2 / 2``. Real input
+    stays real.
+    """
+    state = np.array(state, dtype=np.result_type(state, phase, float))
+    while True:
+        state *= phase
+        np.subtract(2 * state.mean(axis=-1, keepdims=True), state, out=state)
+        yield state
+
+
+def grover_sweep(marked, nit, shots=None, seed=None):
+    """Success probability after ``0 .. nit`` Grover rounds on the oracle array ``marked``.
+
+    Returns ``(success, hits)``: ``success[k]`` is exact, ``hits[k]`` the number
+    of ``shots`` that land on a marked entry when sampling the state after
+    ``k`` rounds (``None`` without ``shots``). Compare with
+    ``grover_planner.success_probability(k, marked.size, marked.sum())``.
+    """
+    marked = np.asarray(marked, dtype=bool)
+    weight = marked.astype(float)
+    state = np.full(marked.shape, 1 / np.sqrt(marked.shape[-1]))
+    success = np.empty((nit + 1,) + marked.shape[:-1])
+    success[0] = np.einsum('...i,...i,...i->...', state, state, weight)
+    steps = grover_steps(state, marked_to_phase(marked))
+    for k in range(1, nit + 1):
+        state = next(steps)
+        success[k] = np.einsum('...i,...i,...i->...', state, state, weight)
+    # rounding can push a probability a hair past 1
+    success = np.clip(success, 0.0, 1.0)
+    if(shots is None):
+        return success, None
+    rng = np.random.default_rng(seed)
+    return success, rng.binomial(shots, success)
+
+
+def uniform_state(nqubit, batch=()):
+    """``H^n |0>`` with optional leading batch shape."""
+    n = 1 << nqubit
+    return np.full(tuple(batch) + (n,), 1 / np.sqrt(n), dtype=complex)
+
+
+def marked_to_phase(marked):
+    """Boolean ``marked`` array -> oracle phase (-1 on marked entries)."""
+    return np.where(marked, -1.0, 1.0)
+
+
+def toggled_boards(board):
+    """Board bitmask toggled by every push pattern ``0 .. 2**nlight - 1``."""
+    return _toggled_boards(as_board(board))
+
+
+@lru_cache(maxsize=None)
+def _toggled_boards(board):
+    nlight = board.nlight
+    rows = board.rows
+    pushes = np.arange(1 << nlight, dtype=np.uint64)
+    bits = parity(rows[:, None] & pushes[None, :])
+    toggled = np.bitwise_or.reduce(bits << np.arange(nlight, dtype=np.uint64)[:, None], axis=0)
+    toggled.setflags(write=False)
+    return toggled
+
+
+def lightsout_marked(boards, board=None):
+    """``marked[b, x]``: push pattern ``x`` clears board ``b`` (boards as 0/1 rows).
+
+    ``board`` is the topology, by default the square board of that size.
+    """
+    boards = np.atleast_2d(boards)
+    masks = to_masks(boards)
+    toggled = toggled_boards(boards.shape[1] if board is None else board)
+    return toggled[None, :] == masks[:, None]
+
+
+def week2a_nit(board):
+    """Iteration count chosen by ``week2a_ans_func`` for ``board`` (or light count)."""
+    board = as_board(board)
+    return plan_iterations(1 << board.nlight, lightsout_marked_count(board))
+
+
+def simulate_week2a(lights, nit=None, board=None):
+    """Probabilities over push patterns measured by ``week2a_ans_func(lights)``.
+
+    ``lights`` may also be a 2D array of boards; the result then has one row per
+    board.
+    """
+    boards = np.atleast_2d(lights)
+    nlight = boards.shape[1]
+    board = as_board(nlight if board is None else board)
+    if(nit is None):
+        nit = week2a_nit(board)
+    phase = marked_to_phase(lightsout_marked(boards, board))
+    state = grover_iterate(uniform_state(nlight, (len(boards),)), phase, nit)
+    probs = np.abs(state) ** 2
+    return probs[0] if np.ndim(lights) == 1 else probs
+
+
+def popcount_table(nbit):
+    """Number of set bits of every integer ``0 .. 2**nbit - 1``."""
+    x = np.arange(1 << nbit)
+    count = np.zeros_like(x)
+    for i in range(nbit):
+        count += (x >> i) & 1
+    return count
+
+
+def simulate_week2b(lightout4, nit=None, min_push=WEEK2B_MIN_PUSH, max_push=WEEK2B_MAX_PUSH):
+    """Probabilities over addresses that ``week2b_ans_func(lightout4)`` is built to measure.
+
+    A model of the algorithm, not a simulation of the circuit (``sparse_sim``
+    runs the circuit itself): ``nit`` push-Grover rounds per address (default
+    ``week2b_nit``, as the builder), a phase flip on push patterns with
+    ``min_push..max_push`` pushes (the counter oracle, same range as the
+    builder), the inverse push-Grover rounds and a single diffusion on the
+    address register. Addresses without a board leave ``is_off`` at 0, i.e.
+    behave as an all-on board.
+    """
+    if(nit is None):
+        nit = week2b_nit(lightout4)
+    boards = np.asarray(lightout4)
+    nboard, nlight = boards.shape
+    naddress = max(1, int(np.ceil(np.log2(nboard))))
+    padded = np.ones((1 << naddress, nlight), dtype=boards.dtype)
+    padded[:nboard] = boards
+
+    solve_phase = marked_to_phase(lightsout_marked(padded))
+    count = popcount_table(nlight)
+    count_phase = marked_to_phase((count >= min_push) & (count <= max_push))
+
+    state = uniform_state(nlight, (1 << naddress,)) / np.sqrt(1 << naddress)
+    state = grover_iterate(state, solve_phase, nit)
+    state = state * count_phase
+    for _ in range(nit):
+        state = 2 * state.mean(axis=-1, keepdims=True) - state
+        state = state * solve_phase
+
+    # Diffusion on the address register: reflection about the mean along axis 0.
+    state = 2 * state.mean(axis=0, keepdims=True) - state
+    return (np.abs(state) ** 2).sum(axis=1)
+
+
+def readout_success(probs, answers, shots=8000):
+    """Chance that the most frequent of ``shots`` samples of ``probs`` is one of the indices ``answers``.
+
+    Each count difference between the likeliest answer and a wrong outcome is
+    taken as normal; the failures are summed over the wrong outcomes (a lower
+    bound on the success).
+    """
+    probs = np.asarray(probs, dtype=float)
+    right = max(probs[a] for a in answers)
+    fail = 0.0
+    for x, p in enumerate(probs):
+        if(x in answers):
+            continue
+        mean = shots * (right - p)
+        sd = sqrt(max(shots * (right + p - (right - p) ** 2), 1e-300))
+        fail += 0.5 * erfc(mean / sd / sqrt(2))
+    return max(0.0, 1.0 - fail)
+
+
+def week2b_answers(lightout4, min_push=WEEK2B_MIN_PUSH, max_push=WEEK2B_MAX_PUSH):
+    """Addresses whose board some pattern of ``min_push..max_push`` pushes clears."""
+    boards = np.asarray(lightout4)
+    count = popcount_table(boards.shape[1])
+    hits = lightsout_marked(boards) & ((count >= min_push) & (count <= max_push))[None, :]
+    return [int(a) for a in np.flatnonzero(hits.any(axis=1))]
+
+
+def week2b_nit(lightout4, min_success=0.99, shots=8000, iteration_cost=WEEK2B_ROUND_COST,
+               base_cost=WEEK2B_BASE_COST):
+    """Push rounds for ``week2b_ans_func(lightout4)``.
+
+    Weighs the chance that the grader reads the right address
+    (``readout_success`` of ``simulate_week2b``, not the inner push-search
+    success) against the circuit cost, among the counts reaching
+    ``min_success``, up to one past the push search's own optimum.
+    """
+    nlight = np.shape(lightout4)[1]
+    answers = week2b_answers(lightout4)
+    kmax = optimal_iterations(1 << nlight, lightsout_marked_count(nlight)) + 1
+    return plan_from_success(lambda ks: [readout_success(simulate_week2b(lightout4, k), answers, shots) for k in ks],
+                             kmax, iteration_cost, base_cost, min_success)
+
+
+def to_bitstring(x, nbit):
+    """Measured bit string of index ``x`` in the exercises' endianness (bit 0 first)."""
+    return ''.join(str((int(x) >> i) & 1) for i in range(nbit))
+
+
+def sample_counts(probs, shots=8000, seed=None):
+    """Counts dictionary like ``result.get_counts()`` drawn from ``probs``."""
+    nbit = int(np.log2(len(probs)))
+    rng = np.random.default_rng(seed)
+    hits = rng.multinomial(shots, probs / probs.sum())
+    return {to_bitstring(x, nbit): int(c) for x, c in enumerate(hits) if c}
+
+
+def top_bitstring(probs):
+    """Bit string the grader would pick: the most probable outcome."""
+    return to_bitstring(int(np.argmax(probs)), int(np.log2(len(probs))))
+
+
+def top_address(probs):
+    """Week2-B answer string: the most probable address, most significant bit first."""
+    return format(int(np.argmax(probs)), '0{}b'.format(int(np.log2(len(probs)))))
@@ -0,0 +1,208 @@
+"""Classical reference solver for the Lights Out puzzle (Week2-A / Week2-B).
+
+A board of ``nlight`` lights is encoded as an integer bitmask where bit ``i``
+is ``lights[i]``. Pushing switch ``i`` toggles every light in ``push[i]``, so a
+push pattern ``x`` clears the board iff ``T x = lights`` over GF(2), with ``T``
+the toggle matrix built from the ``push`` table of a ``board.Board``. The rows of ``T`` are stored
+bit-packed in ``uint64`` words and reduced once by Gaussian elimination; each
+board is then solved with a handful of AND/parity operations, which NumPy
+vectorizes over whole batches of boards.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from board import as_board
+
+# solve_batch result of an unsolvable board: all ones, never a push pattern since nlight < 64
+UNSOLVABLE = np.iinfo(np.uint64).max
+
+
+def to_mask(bits):
+    """``[b0, b1, ...]`` -> integer with bit ``i`` set iff ``bits[i]``."""
+    mask = 0
+    for i, b in enumerate(bits):
+        if(int(b)):
+            mask |= 1 << i
+    return mask
+
+
+def from_mask(mask, nbit):
+    """Inverse of ``to_mask``."""
+    return [(int(mask) >> i) & 1 for i in range(nbit)]
+
+
+def to_masks(boards):
+    """2D 0/1 array (one board per row) -> ``uint64`` bitmask per board."""
+    boards = np.asarray(boards, dtype=np.uint64)
+    weights = np.left_shift(np.uint64(1), np.arange(boards.shape[1], dtype=np.uint64))
+    return np.bitwise_or.reduce(boards * weights, axis=1)
+
+
+def from_masks(masks, nbit):
+    """Inverse of ``to_masks``."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    shifts = np.arange(nbit, dtype=np.uint64)
+    return ((masks[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def parity(words):
+    """Bitwise parity of every ``uint64`` in ``words``."""
+    words = np.array(words, dtype=np.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        words ^= words >> np.uint64(shift)
+    return words & np.uint64(1)
+
+
+class LightsOutSolver:
+    """GF(2) solver for a fixed toggle matrix.
+
+    The elimination is done once at construction. ``transform[r]`` records which
+    original rows were XORed into reduced row ``r``, so a board ``b`` reduces to
+    ``parity(transform & b)`` without touching the matrix again.
+    """
+
+    def __init__(self, rows, nlight):
+        if(nlight > 63):
+            raise ValueError('at most 63 lights fit in a uint64 row, got {}'.format(nlight))
+        self.nlight = nlight
+        self.rows = np.array(rows, dtype=np.uint64)
+        reduced = [int(r) for r in rows]
+        transform = [1 << i for i in range(nlight)]
+        pivots = []
+        rank = 0
+        for col in range(nlight):
+            bit = 1 << col
+            sel = next((r for r in range(rank, nlight) if reduced[r] & bit), None)
+            if(sel is None):
+                continue
+            reduced[rank], reduced[sel] = reduced[sel], reduced[rank]
+            transform[rank], transform[sel] = transform[sel], transform[rank]
+            for r in range(nlight):
+                if(r != rank and reduced[r] & bit):
+                    reduced[r] ^= reduced[rank]
+                    transform[r] ^= transform[rank]
+            pivots.append(col)
+            rank += 1
+
+        self.rank = rank
+        self.pivots = pivots
+        self.free = [c for c in range(nlight) if c not in pivots]
+        self.reduced = np.array(reduced, dtype=np.uint64)
+        self.transform = np.array(transform, dtype=np.uint64)
+
+        # Null space: one basis vector per free column.
+        kernel = []
+        for f in self.free:
+            vec = 1 << f
+            for r, p in enumerate(pivots):
+                if(reduced[r] >> f & 1):
+                    vec |= 1 << p
+            kernel.append(vec)
+        self.kernel = kernel
+
+        # Pivot columns as shifts, so ``solve_batch`` can scatter bits in one go.
+        self._pivot_shift = np.array(pivots, dtype=np.uint64)
+
+    @property
+    def nsolution(self):
+        """Number of push patterns solving any solvable board (``2**dim(kernel)``)."""
+        return 1 << len(self.kernel)
+
+    def solve(self, lights):
+        """Particular solution (free pushes set to 0) as a 0/1 list, or ``None`` if unsolvable."""
+        mask = to_mask(lights) if not np.isscalar(lights) else int(lights)
+        x = self.solve_batch(np.array([mask], dtype=np.uint64))
+        if(x[0] == UNSOLVABLE):
+            return None
+        return from_mask(int(x[0]), self.nlight)
+
+    def solutions(self, lights):
+        """Every push pattern (as bitmask) that clears ``lights``; empty if unsolvable."""
+        x = self.solve(lights)
+        if(x is None):
+            return []
+        x = to_mask(x)
+        sols = [x]
+        for vec in self.kernel:
+            sols += [s ^ vec for s in sols]
+        return sorted(sols)
+
+    def min_push(self, lights):
+        """Solution with the fewest pushes, or ``None`` if unsolvable."""
+        sols = self.solutions(lights)
+        if(not sols):
+            return None
+        return from_mask(min(sols, key=lambda s: bin(s).count('1')), self.nlight)
+
+    def solve_batch(self, masks):
+        """Vectorized ``solve`` over a ``uint64`` array of board bitmasks.
+
+        Returns one solution bitmask per board; unsolvable boards are marked with
+        ``UNSOLVABLE``.
+        """
+        masks = np.asarray(masks, dtype=np.uint64)
+        reduced = parity(self.transform[:, None] & masks[None, :])
+        x = np.bitwise_or.reduce(reduced[:self.rank] << self._pivot_shift[:, None], axis=0) \
+            if self.rank else np.zeros(len(masks), dtype=np.uint64)
+        bad = np.any(reduced[self.rank:], axis=0)
+        x[bad] = UNSOLVABLE
+        return x
+
+    def solvable_batch(self, masks):
+        """Boolean array: which boards in ``masks`` have at least one solution."""
+        masks = np.asarray(masks, dtype=np.uint64)
+        if(self.rank == self.nlight):
+            return np.ones(len(masks), dtype=bool)
+        return ~np.any(parity(self.transform[self.rank:, None] & masks[None, :]), axis=0)
+
+    def check_batch(self, masks, pushes):
+        """``True`` where push pattern ``pushes[k]`` clears board ``masks[k]``."""
+        masks = np.asarray(masks, dtype=np.uint64)
+        pushes = np.asarray(pushes, dtype=np.uint64)
+        toggled = np.bitwise_or.reduce(
+            parity(self.rows[:, None] & pushes[None, :]) << np.arange(self.nlight, dtype=np.uint64)[:, None],
+            axis=0)
+        return toggled == masks
+
+
+def chase_forms(board):
+    """Light chasing on a grid board as affine forms of the first-row pushes.
+
+    Row 0 pushes ``x`` are free; push ``(r, c)`` for ``r > 0`` is whatever clears
+    light ``(r-1, c)``, so every push and every final light is an affine
+    function of ``x`` and the input lights. A form is ``(xmask, lmask)`` with
+    value ``parity(xmask & x) ^ parity(lmask & lights)``.
+
+    Returns ``(pushes, checks)``: the form of every push, and the final forms of
+    the lights chasing does not clear by construction (the last row). ``x``
+    solves the board iff every check is 0. Only open grids qualify: on a torus
+    the last row toggles row 0 again after it has been chased.
+    """
+    return _chase_forms(as_board(board))
+
+
+@lru_cache(maxsize=None)
+def _chase_forms(board):
+    if(board.shape is None or board.torus):
+        raise ValueError('light chasing needs an open grid board, got {!r}'.format(board))
+    nrow, ncol = board.shape
+    light = [(0, 1 << i) for i in range(board.nlight)]
+    pushes = []
+    for i in range(board.nlight):
+        p = (1 << i, 0) if i < ncol else light[i - ncol]
+        pushes.append(p)
+        for j in board.push[i]:
+            light[j] = (light[j][0] ^ p[0], light[j][1] ^ p[1])
+    checks = [f for f in light if f != (0, 0)]
+    return pushes, checks
+
+
+@lru_cache(maxsize=None)
+def _solver(board):
+    return LightsOutSolver(board.rows, board.nlight)
+
+
+def get_solver(board):
+    """Cached solver for a ``Board`` (or the square board with that many lights)."""
+    return _solver(as_board(board))
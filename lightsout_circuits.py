@@ -0,0 +1,222 @@
+"""Grover circuit builders for the Lights Out exercises.
+
+``week2a_ans_func`` only depends on ``lights`` through the X gates that flip
+``is_off[i]`` for every light that is off. The push/oracle/diffusion skeleton is
+therefore built once per ``(board, nit)`` with an X on every ``is_off`` qubit,
+and each board is stamped out by dropping the X gates of the lights that are on.
+
+``week2a_chase_circuit`` is the light-chasing variant: only the first-row
+pushes are searched, the rest follow from them classically.
+"""
+from functools import lru_cache
+
+from qiskit import QuantumCircuit, ClassicalRegister, QuantumRegister
+
+from board import as_board
+from grover_planner import lightsout_marked_count, plan_iterations
+from grover_sim import week2a_nit
+from lightsout import chase_forms, to_mask
+from mcx_synth import auto_mcx
+
+
+def build_week2a(board, nit, lights=None):
+    """Build the Week2-A circuit on ``board``; returns ``(qc, x_index)``.
+
+    ``lights=None`` builds the template: an X on every ``is_off`` qubit in each
+    conditioning layer. ``x_index[i]`` lists the positions in ``qc.data`` of the
+    X gates conditioning on light ``i``.
+    """
+    nlight = board.nlight
+    r_ispush = QuantumRegister(nlight, "is_push")
+    r_isoff = QuantumRegister(nlight, "is_off")
+    r_oracle = QuantumRegister(1, "oracle")
+    cr_measure = ClassicalRegister(nlight, "m")
+    qc = QuantumCircuit(r_ispush, r_isoff, r_oracle, cr_measure)
+    push = board.push
+    x_index = [[] for _ in range(nlight)]
+
+    def x_layer():
+        for i in range(nlight):
+            if(lights is None or not lights[i]):
+                x_index[i].append(len(qc.data))
+                qc.x(r_isoff[i])
+        qc.barrier()
+
+    # Grover
+    qc.x(r_oracle)
+    qc.h(r_ispush)
+    qc.barrier()
+
+    for _ in range(nit):
+
+        ### Oracle ###
+        x_layer()
+
+        for i, q_ispush in enumerate(r_ispush):
+            for j in push[i]:
+                qc.cx([q_ispush], r_isoff[j])
+        qc.barrier()
+        qc.h(r_oracle)
+        # is_push is busy but usable as dirty ancillas
+        auto_mcx(qc, r_isoff, r_oracle[0])
+        qc.h(r_oracle)
+        qc.barrier()
+        for i, q_ispush in enumerate(reversed(r_ispush)):
+            for j in reversed(push[nlight - i - 1]):
+                qc.cx([q_ispush], r_isoff[j])
+        qc.barrier()
+
+        x_layer()
+        ##############
+
+        qc.h(r_ispush)
+        qc.x(r_ispush)
+        qc.h(r_ispush[-1])
+        # is_off is back to |0> here
+        auto_mcx(qc, r_ispush[:nlight-1], r_ispush[-1], clean=r_isoff)
+        qc.h(r_ispush[-1])
+        qc.x(r_ispush)
+        qc.h(r_ispush)
+        qc.barrier()
+    qc.measure(r_ispush[::-1], cr_measure)
+
+    return qc, x_index
+
+
+@lru_cache(maxsize=None)
+def week2a_template(board, nit):
+    """Cached ``(qc, x_index)`` skeleton for ``board``."""
+    return build_week2a(board, nit)
+
+
+def stamp(template, drop):
+    """Copy ``template`` without the instructions at positions ``drop``.
+
+    The gates are shared with the template, not copied: they are plain
+    unparametrized, unconditioned gates that nothing edits in place (call
+    ``qc.copy()`` first to change one). The entry list and the qubit lists
+    are new, so adding, removing or rewiring instructions leaves the
+    template alone.
+    """
+    qc = QuantumCircuit(*template.qregs, *template.cregs)
+    drop = set(drop)
+    # the template holds no parameters, so the parameter table stays empty
+    qc._data = [(op, list(qargs), list(cargs)) for k, (op, qargs, cargs) in enumerate(template._data)
+                if k not in drop]
+    return qc
+
+
+def week2a_circuit(lights, nit=None, board=None):
+    """Week2-A circuit for ``lights``, stamped from the cached template.
+
+    ``board`` defaults to the square board with ``len(lights)`` lights.
+    """
+    board = as_board(len(lights) if board is None else board)
+    if(nit is None):
+        nit = week2a_nit(board)
+    template, x_index = week2a_template(board, nit)
+    drop = [k for i, light in enumerate(lights) if light for k in x_index[i]]
+    return stamp(template, drop)
+
+
+def flip_all_ones(qc, qubits, clean=()):
+    """Phase -1 on the state where every qubit in ``qubits`` is 1."""
+    if(len(qubits) == 1):
+        qc.z(qubits[0])
+    else:
+        qc.h(qubits[-1])
+        auto_mcx(qc, qubits[:-1], qubits[-1], clean=clean)
+        qc.h(qubits[-1])
+
+
+def build_chase(board, nit):
+    """Light-chasing Week2-A template on ``board``; returns ``(qc, x_cond)``.
+
+    Grover only searches the first-row pushes ``x``. The oracle computes the
+    final last-row lights (affine in ``x``, see ``lightsout.chase_forms``) into
+    the row-1 qubits of ``is_push``, which are otherwise idle, and flips the
+    phase when they are all off. After the search the remaining pushes are
+    written from ``x`` with CX gates, so the same ``nlight`` bits are measured
+    as in ``week2a_ans_func`` without any oracle or ancilla qubit.
+
+    ``x_cond`` lists ``(position, lmask, keep)``: the X gate at ``position`` in
+    ``qc.data`` belongs in the circuit iff ``parity(lmask & lights) == keep``.
+    """
+    nlight = board.nlight
+    ncol = board.shape[1]
+    pushes, checks = chase_forms(board)
+    if(len(checks) > nlight - ncol):
+        raise ValueError('not enough idle qubits for {} checks on {!r}'.format(len(checks), board))
+    r_ispush = QuantumRegister(nlight, "is_push")
+    cr_measure = ClassicalRegister(nlight, "m")
+    qc = QuantumCircuit(r_ispush, cr_measure)
+    r_x = r_ispush[:ncol]
+    r_check = r_ispush[ncol:ncol + len(checks)]
+    x_cond = []
+
+    def affine(target, form, keep):
+        xmask, lmask = form
+        for i in range(ncol):
+            if(xmask >> i & 1):
+                qc.cx(r_x[i], target)
+        x_cond.append((len(qc.data), lmask, keep))
+        qc.x(target)
+
+    qc.h(r_x)
+    qc.barrier()
+
+    for _ in range(nit):
+
+        ### Oracle ###
+        # check bit is 1 iff that light ends up off
+        for q, form in zip(r_check, checks):
+            affine(q, form, 0)
+        qc.barrier()
+        flip_all_ones(qc, r_check, clean=r_ispush[ncol + len(checks):])
+        qc.barrier()
+        for q, form in zip(r_check, checks):
+            affine(q, form, 0)
+        qc.barrier()
+        ##############
+
+        qc.h(r_x)
+        qc.x(r_x)
+        flip_all_ones(qc, r_x, clean=r_ispush[ncol:])
+        qc.x(r_x)
+        qc.h(r_x)
+        qc.barrier()
+
+    # chase: write the remaining pushes from the first row
+    for i in range(ncol, nlight):
+        affine(r_ispush[i], pushes[i], 1)
+    qc.barrier()
+    qc.measure(r_ispush[::-1], cr_measure)
+
+    return qc, x_cond
+
+
+def chase_nit(board):
+    """Iterations for the first-row search of ``board``."""
+    board = as_board(board)
+    return plan_iterations(1 << board.shape[1], lightsout_marked_count(board))
+
+
+@lru_cache(maxsize=None)
+def chase_template(board, nit):
+    """Cached ``(qc, x_cond)`` light-chasing skeleton for ``board``."""
+    return build_chase(board, nit)
+
+
+def week2a_chase_circuit(lights, nit=None, board=None):
+    """Week2-A circuit for ``lights`` searching only the first-row pushes.
+
+    Needs ``nlight`` qubits instead of ``2 * nlight + 1``: 9 for 3x3 boards, 25
+    for 5x5.
+    """
+    board = as_board(len(lights) if board is None else board)
+    if(nit is None):
+        nit = chase_nit(board)
+    template, x_cond = chase_template(board, nit)
+    lmask = to_mask(lights)
+    drop = [k for k, mask, keep in x_cond if bin(mask & lmask).count('1') % 2 != keep]
+    return stamp(template, drop)
@@ -0,0 +1,374 @@
+"""LiH dissociation curve, one geometry per task on a process pool.
+
+The VQE cell of ``cwq-1.py`` solves its bond lengths one after the other
+(PySCF, qubit mapping, exact eigensolver, UCCSD VQE), which takes hours. The
+geometries are independent, so ``sweep`` hands them to a process pool and
+puts the results back in grid order.
+
+Every worker is capped at ``threads`` BLAS / OpenMP threads: PySCF and numpy
+otherwise start one thread per core in every worker, and ``workers`` pools of
+``ncore`` threads fight over the same cores. Keep ``workers * threads`` at the
+number of cores (the default).
+
+Neighbouring bond lengths have nearly the same optimal UCCSD parameters, so
+with ``warm_start`` a few geometries spread over the grid start cold (from the
+UCCSD default point) and every other one starts from the converged point of
+the nearest finished geometry, or with ``extrapolate`` from the line through
+the two nearest finished ones on the same side. Each point records how many
+evaluations its optimizer used; ``warm_start_savings`` compares warm and cold
+starts.
+
+A kernel restart used to lose the whole sweep. With ``store``, each result
+(energies, optimal parameters, evaluation counts, timing) is appended to a
+JSON-lines file as soon as its geometry finishes, and a rerun only solves the
+distances missing from it. ``load_results`` reads the file back for plotting.
+
+Most of the fixed 0.25 Angstrom grid lies on the flat dissociation tail, while
+the well is sampled coarsely. ``adaptive_sweep`` starts from a coarse grid and
+only adds geometries where a cubic spline through the points is not accurate
+yet, until the equilibrium distance and the well depth are converged.
+"""
+import json
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from qiskit import BasicAer
+from qiskit.aqua import QuantumInstance
+from qiskit.aqua.algorithms import NumPyMinimumEigensolver, VQE
+from qiskit.aqua.components.optimizers import SLSQP
+from qiskit.chemistry.components.initial_states import HartreeFock
+from qiskit.chemistry.components.variational_forms import UCCSD
+from qiskit.chemistry.core import Hamiltonian, QubitMappingType
+from qiskit.chemistry.drivers import PySCFDriver
+from scipy.interpolate import CubicSpline
+
+from chem_cache import CACHE_DIR, hamiltonian
+
+MOLECULE = 'H .0 .0 -{0}; Li .0 .0 {0}'
+DISTANCES = np.arange(0.5, 4.25, 0.25)
+BASIS = 'sto3g'
+MAPPING = {
+    'qubit_mapping': QubitMappingType.PARITY,
+    'two_qubit_reduction': True,
+    'freeze_core': True,
+    'orbital_reduction': [-3, -2],
+}
+THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+               'NUMEXPR_NUM_THREADS')
+
+
+def limit_threads(nthread):
+    """Cap BLAS / OpenMP threads in this process (the pool initializer).
+
+    The worker is forked with numpy already loaded, so its BLAS and OpenMP
+    pools are capped with ``threadpoolctl``; the environment variables only
+    reach libraries loaded after this point.
+    """
+    for var in THREAD_VARS:
+        os.environ[var] = str(nthread)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        warnings.warn('threadpoolctl is not installed: BLAS / OpenMP threads of this sweep worker are not '
+                      'capped at {}, the workers may oversubscribe the cores'.format(nthread), RuntimeWarning)
+    else:
+        threadpool_limits(nthread)
+    from pyscf import lib
+    lib.num_threads(nthread)
+
+
+def solve(distance, maxiter=1000, initial_point=None, cache_dir=CACHE_DIR):
+    """Exact, VQE and Hartree-Fock energies of LiH at bond length ``distance`` (Angstrom).
+
+    Returns a dict: ``distance``, ``exact``, ``vqe``, ``hf``, ``parameters``
+    (optimal VQE point), ``optimizer_evals`` (SLSQP's own evaluations),
+    ``energy_evals`` (every energy evaluation, finite-difference gradients
+    included) and ``time`` (seconds). ``initial_point=None`` starts VQE from
+    the UCCSD default. The SCF and the qubit mapping come from ``chem_cache``
+    unless ``cache_dir`` is ``None``.
+    """
+    start = time.time()
+    if(cache_dir is None):
+        qmolecule = PySCFDriver(MOLECULE.format(distance / 2), basis=BASIS).run()
+        operator = Hamiltonian(**MAPPING)
+        qubit_op, aux_ops = operator.run(qmolecule)
+    else:
+        operator, qubit_op, aux_ops = hamiltonian(MOLECULE.format(distance / 2), BASIS, cache_dir, **MAPPING)
+
+    # exact classical result
+    exact_result = NumPyMinimumEigensolver(qubit_op, aux_operators=aux_ops).compute_minimum_eigenvalue()
+    exact_result = operator.process_algorithm_result(exact_result)
+
+    # VQE
+    optimizer = SLSQP(maxiter=maxiter)
+    initial_state = HartreeFock(operator.molecule_info['num_orbitals'],
+                                operator.molecule_info['num_particles'],
+                                qubit_mapping=operator._qubit_mapping,
+                                two_qubit_reduction=operator._two_qubit_reduction)
+    var_form = UCCSD(num_orbitals=operator.molecule_info['num_orbitals'],
+                     num_particles=operator.molecule_info['num_particles'],
+                     initial_state=initial_state,
+                     qubit_mapping=operator._qubit_mapping,
+                     two_qubit_reduction=operator._two_qubit_reduction)
+    algo = VQE(qubit_op, var_form, optimizer, initial_point=initial_point, aux_operators=aux_ops)
+    raw_result = algo.run(QuantumInstance(BasicAer.get_backend('statevector_simulator')))
+    vqe_result = operator.process_algorithm_result(raw_result)
+
+    return {
+        'distance': float(distance),
+        'exact': float(exact_result.energy),
+        'vqe': float(vqe_result.energy),
+        'hf': float(vqe_result.hartree_fock_energy),
+        'parameters': [float(x) for x in raw_result.optimal_point],
+        'optimizer_evals': int(raw_result.optimizer_evals),
+        'energy_evals': int(raw_result.cost_function_evals),
+        'time': time.time() - start,
+    }
+
+
+def seed_distances(distances, nseed):
+    """``nseed`` distances spread evenly over ``distances`` (the middle one for ``nseed=1``)."""
+    n = len(distances)
+    return [distances[(2 * i + 1) * n // (2 * nseed)] for i in range(nseed)]
+
+
+def next_start(pending, done, extrapolate=False):
+    """``(distance, initial_point, sources)`` of the pending distance nearest to a finished one.
+
+    ``done`` maps distance to its result. The point is the nearest result's
+    parameters, or the line through the two nearest results on the same side.
+    """
+    d = min(pending, key=lambda x: (min(abs(x - y) for y in done), x))
+    near = sorted(done, key=lambda y: abs(d - y))
+    d1 = near[0]
+    p1 = np.array(done[d1]['parameters'])
+    if(extrapolate):
+        side = [y for y in near[1:] if (y - d) * (d1 - d) > 0]
+        if(side):
+            d2 = side[0]
+            p2 = np.array(done[d2]['parameters'])
+            return d, list(p1 + (p1 - p2) * (d - d1) / (d1 - d2)), [d1, d2]
+    return d, list(p1), [d1]
+
+
+def point_key(distance):
+    """Distances equal up to float noise share a key."""
+    return round(float(distance), 9)
+
+
+def sweep_settings(maxiter=1000, warm_start=False, extrapolate=False):
+    """Everything besides the distance that changes a stored energy, as stored in each record."""
+    settings = {
+        'molecule': MOLECULE,
+        'basis': BASIS,
+        'mapping': MAPPING,
+        'maxiter': maxiter,
+        'warm_start': warm_start,
+        'extrapolate': extrapolate,
+    }
+    # as read back from the file: enums by value, tuples as lists
+    return json.loads(json.dumps(settings, default=lambda v: getattr(v, 'value', str(v))))
+
+
+def load_results(path, settings=None):
+    """Records of the results file ``path``, by distance (the last record of a distance wins).
+
+    With ``settings`` (``sweep_settings``), only records made with those
+    settings are read; records of other runs in the same file are ignored.
+    A line cut short by a crash is skipped.
+    """
+    if(path is None or not os.path.exists(path)):
+        return []
+    records = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if(settings is None or record.get('settings') == settings):
+                records[point_key(record['distance'])] = record
+    return [records[k] for k in sorted(records)]
+
+
+def append_result(path, record):
+    """Append ``record`` to the results file ``path`` as one JSON line, flushed to disk."""
+    with open(path, 'a+b') as f:
+        # a record cut short by a crash must not swallow this one
+        if(f.tell()):
+            f.seek(-1, os.SEEK_END)
+            if(f.read(1) != b'\n'):
+                f.write(b'\n')
+        f.write(json.dumps(record).encode() + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def sweep(distances=DISTANCES, workers=None, threads=1, maxiter=1000, warm_start=False, extrapolate=False,
+          nseed=None, cache_dir=CACHE_DIR, store=None, previous=()):
+    """``solve`` every distance on a pool of ``workers`` processes; results in the order of ``distances``.
+
+    ``workers`` defaults to ``cpu_count() // threads`` (at most one per
+    distance). With ``warm_start``, ``nseed`` geometries (default: one per
+    worker, at most a third of the grid) start cold and every other one is
+    submitted once a neighbour has finished; each result has ``sources``, the
+    distances its initial point came from (empty for a cold start).
+
+    With ``store`` (a path), every result is appended to that file as soon as
+    it finishes, tagged with its ``sweep_settings``, and distances already in
+    it with the same settings are not solved again; their stored parameters
+    also serve as warm starts. So do ``previous`` results.
+    """
+    distances = [float(d) for d in distances]
+    settings = sweep_settings(maxiter, warm_start, extrapolate)
+    done = {point_key(p['distance']): p for p in list(previous) + load_results(store, settings)}
+    pending = {d for d in distances if point_key(d) not in done}
+    if(workers is None):
+        workers = max(1, min(len(pending), (os.cpu_count() or 1) // threads))
+    if(not warm_start):
+        starts = [(d, None, []) for d in distances if d in pending]
+    elif(done or not pending):
+        starts = []
+    else:
+        if(nseed is None):
+            nseed = max(1, min(workers, len(pending) // 3))
+        starts = [(d, None, []) for d in seed_distances(sorted(pending), nseed)]
+    pending -= {d for d, _, _ in starts}
+
+    def ready():
+        return starts or (pending and done)
+
+    def take():
+        if(starts):
+            return starts.pop(0)
+        start = next_start(pending, done, extrapolate)
+        pending.discard(start[0])
+        return start
+
+    def finish(result, sources):
+        record = dict(result, sources=sources, finished=time.time(), settings=settings)
+        done[point_key(record['distance'])] = record
+        if(store is not None):
+            append_result(store, record)
+
+    if(workers == 1):
+        while ready():
+            d, point, sources = take()
+            finish(solve(d, maxiter, point, cache_dir), sources)
+    else:
+        error = None
+        with ProcessPoolExecutor(max_workers=workers, initializer=limit_threads, initargs=(threads,)) as pool:
+            running = {}
+            while running or (ready() and error is None):
+                while ready() and error is None and len(running) < workers:
+                    d, point, sources = take()
+                    running[pool.submit(solve, d, maxiter, point, cache_dir)] = sources
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    sources = running.pop(future)
+                    if(future.exception() is not None):
+                        # stop submitting, but keep what is still running
+                        error = error or future.exception()
+                    else:
+                        finish(future.result(), sources)
+        if(error is not None):
+            raise error
+    return [done[point_key(d)] for d in distances]
+
+
+def warm_start_savings(points):
+    """Evaluations the warm starts saved against the mean cold start.
+
+    Returns a dict: ``cold`` / ``warm`` (number of points), and per counter
+    (``optimizer_evals``, ``energy_evals``) the mean of the cold starts, the
+    mean of the warm starts and ``saved``, the total over the warm points.
+    """
+    cold = [p for p in points if not p.get('sources')]
+    warm = [p for p in points if p.get('sources')]
+    result = {'cold': len(cold), 'warm': len(warm)}
+    for key in ('optimizer_evals', 'energy_evals'):
+        base = np.mean([p[key] for p in cold]) if cold else float('nan')
+        mean = np.mean([p[key] for p in warm]) if warm else float('nan')
+        result[key] = {'cold': base, 'warm': mean, 'saved': len(warm) * (base - mean)}
+    return result
+
+
+def fit_curve(points, key='vqe'):
+    """Cubic spline of ``key`` energies against distance, with its minimum and well depth.
+
+    Returns ``(spline, r_eq, e_min, depth)``; the depth is taken against the
+    energy at the largest distance, the closest point to dissociation.
+    """
+    d = np.array([p['distance'] for p in points])
+    e = np.array([p[key] for p in points])
+    spline = CubicSpline(d, e)
+    candidates = [x for x in spline.derivative().roots(extrapolate=False) if d[0] <= x <= d[-1]]
+    r_eq = min(candidates + [d[np.argmin(e)]], key=spline)
+    e_min = float(spline(r_eq))
+    return spline, float(r_eq), e_min, float(e[-1] - e_min)
+
+
+def interpolation_errors(points, key='vqe'):
+    """Interpolation error of the spline around every interior point, ``0`` at the ends.
+
+    Leaving point ``i`` out doubles the spacing there and a cubic spline's
+    error scales with its fourth power: the estimate is
+    ``|spline without point i (d_i) - E_i| / 16``.
+    """
+    d = np.array([p['distance'] for p in points])
+    e = np.array([p[key] for p in points])
+    errors = np.zeros(len(d))
+    for i in range(1, len(d) - 1):
+        keep = np.arange(len(d)) != i
+        errors[i] = abs(CubicSpline(d[keep], e[keep])(d[i]) - e[i]) / 16
+    return errors
+
+
+def adaptive_sweep(lo=0.5, hi=4.0, step=0.5, tol_distance=0.01, tol_energy=1.6e-3, max_points=40, key='vqe',
+                   **options):
+    """Sweep a coarse grid, then refine where the curve is not resolved yet.
+
+    Every round fits a cubic spline to the ``key`` energies and adds the
+    midpoints of the intervals next to a point inside the well (below the
+    energy at the largest distance) whose ``interpolation_errors`` exceeds
+    ``tol_energy``, and of the two intervals around the minimum until the
+    equilibrium distance and the well depth change by less than
+    ``tol_distance`` / ``tol_energy`` from one round to the next. It stops
+    when a round adds nothing or at ``max_points`` solved distances. ``options`` go to ``sweep`` (``workers``,
+    ``warm_start``, ``store``, ...).
+
+    Returns a dict: ``points`` (sorted by distance), ``r_eq``, ``e_min``,
+    ``depth`` and ``rounds`` (per round: ``npoint``, ``r_eq``, ``depth``,
+    ``added``).
+    """
+    done = {}
+    todo = list(np.arange(lo, hi + step / 2, step))
+    rounds = []
+    while todo:
+        for p in sweep(todo, previous=list(done.values()), **options):
+            done[point_key(p['distance'])] = p
+        points = [done[k] for k in sorted(done)]
+        _, r_eq, e_min, depth = fit_curve(points, key)
+        settled = bool(rounds) and abs(r_eq - rounds[-1]['r_eq']) < tol_distance \
+            and abs(depth - rounds[-1]['depth']) < tol_energy
+
+        d = [p['distance'] for p in points]
+        add = set()
+        # the repulsive wall above the dissociation energy moves neither result
+        inside = np.array([p[key] for p in points]) < points[-1][key]
+        for i in np.flatnonzero((interpolation_errors(points, key) > tol_energy) & inside):
+            add.update(((d[i - 1] + d[i]) / 2, (d[i] + d[i + 1]) / 2))
+        if(not settled):
+            i = int(np.searchsorted(d, r_eq))
+            add.update((d[j - 1] + d[j]) / 2 for j in (i, i + 1) if 0 < j < len(d))
+        todo = sorted(x for x in add if point_key(x) not in done)[:max(0, max_points - len(done))]
+        rounds.append({'npoint': len(points), 'r_eq': r_eq, 'depth': depth, 'added': todo})
+    return {'points': points, 'r_eq': r_eq, 'e_min': e_min, 'depth': depth, 'rounds': rounds}
+
+
+def curves(points):
+    """``(exact_energies, vqe_energies, hf_energies)`` of ``sweep`` results."""
+    return ([p['exact'] for p in points], [p['vqe'] for p in points], [p['hf'] for p in points])
@@ -0,0 +1,192 @@
+"""Offline stand-in for ``qc_grader``.
+
+Same function names and signatures as the challenge grader, so a notebook can
+switch with ``from local_grader import prepare_ex2a, grade_ex2a, ...``. No job
+leaves the machine:
+
+- ``prepare_ex*`` builds the answer circuit for the notebook's input plus
+  ``nvalidation`` random inputs with the same promise (``problems``), on a
+  process pool, and samples each one from the exact distribution computed by
+  ``sparse_sim`` (no 28-qubit statevector);
+- ``grade_ex*`` checks that the most frequent counts key is a correct answer
+  for every input, that the circuit fits the qubit limit, and reports the cost
+  of the circuit for the original input (``u3 + 10 * cx``);
+- ``submit_ex*`` only says that nothing was submitted.
+
+The answer function must be picklable (defined at module level) to run on
+the pool; ``workers=1`` runs everything in process.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from qiskit import QuantumCircuit
+
+from grover_planner import optimal_iterations
+from problems import (EX2A_LIGHTS, EX2B_LIGHTSOUT4, EX3_PROBLEM_SET, ex2a_answers, ex2b_answers,
+                      ex3_answers, random_ex2a, random_ex2b, random_ex3)
+from qcost import quantum_cost
+from sparse_sim import counts_key, outcome_probabilities, sample_counts
+
+SHOTS = 8000
+MAX_QUBITS = 28
+NVALIDATION = 2
+SEED = 2020
+
+
+class LocalJob:
+    """What ``prepare_ex*`` returns; ``job.result().get_counts()`` works as with a real job."""
+
+    def __init__(self, exercise, inputs, answers, runs):
+        self.exercise = exercise
+        self.inputs = inputs
+        self.answers = answers
+        # per input: {'counts', 'cost', 'nqubit', 'error'}
+        self.runs = runs
+
+    def result(self):
+        return self
+
+    def get_counts(self, experiment=None):
+        counts = [run['counts'] for run in self.runs]
+        return counts if experiment is None else counts[experiment]
+
+
+def run_answer(ans_func, problem, shots=SHOTS, seed=None):
+    """Build ``ans_func(problem)``, cost it and sample it; errors are returned, not raised."""
+    try:
+        qc = ans_func(problem)
+        return {
+            'counts': sample_counts(qc, shots, seed),
+            'cost': quantum_cost(qc),
+            'nqubit': qc.num_qubits,
+            'error': None,
+        }
+    except Exception as err:
+        return {'counts': {}, 'cost': None, 'nqubit': None, 'error': '{}: {}'.format(type(err).__name__, err)}
+
+
+def run_many(ans_func, problems, shots=SHOTS, seed=None, workers=None):
+    """``run_answer`` over ``problems`` on a process pool, in order."""
+    seeds = np.random.SeedSequence(seed).spawn(len(problems))
+    seeds = [int(s.generate_state(1)[0]) for s in seeds]
+    if(workers == 1 or len(problems) == 1):
+        return [run_answer(ans_func, p, shots, s) for p, s in zip(problems, seeds)]
+    workers = workers or os.cpu_count()
+    # a few chunks per worker: thousands of small jobs would be dominated by pickling
+    chunksize = max(1, len(problems) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_answer, [ans_func] * len(problems), problems, [shots] * len(problems), seeds,
+                             chunksize=chunksize))
+
+
+def top_key(counts):
+    """The key the grader treats as the answer: the most frequent one."""
+    return max(counts, key=counts.get) if counts else None
+
+
+def prepare(exercise, ans_func, original, answers, generate, nvalidation, seed, workers):
+    rng = np.random.default_rng(seed)
+    inputs = [original]
+    expected = [answers(original)]
+    for _ in range(nvalidation):
+        problem, ok = generate(rng)
+        inputs.append(problem)
+        expected.append(ok)
+    return LocalJob(exercise, inputs, expected, run_many(ans_func, inputs, seed=seed, workers=workers))
+
+
+def grade(job, max_qubits=MAX_QUBITS):
+    """Print the verdict for ``job``; returns ``True`` if every input was answered correctly."""
+    passed = True
+    for i, (run, ok) in enumerate(zip(job.runs, job.answers)):
+        name = 'original input' if i == 0 else 'validation input {}'.format(i)
+        if(run['error']):
+            print('{}: {} failed: {}'.format(job.exercise, name, run['error']))
+            passed = False
+            continue
+        if(run['nqubit'] > max_qubits):
+            print('{}: {} uses {} qubits, the limit is {}'.format(job.exercise, name, run['nqubit'], max_qubits))
+            passed = False
+        top = top_key(run['counts'])
+        if(top not in ok):
+            print('{}: {} answered {!r}, expected {}'.format(job.exercise, name, top, ' or '.join(sorted(ok))))
+            passed = False
+    if(passed):
+        print('{}: correct on {} inputs. Your score is {}.'.format(job.exercise, len(job.runs), job.runs[0]['cost']))
+    return passed
+
+
+def not_submitted(exercise):
+    print('{}: graded locally, nothing was submitted. Use qc_grader to submit.'.format(exercise))
+
+
+def grade_ex1a(qc):
+    """Full adder: A, B, X on ``q[0:3]``, S on ``c[0]`` and C on ``c[1]`` for all 8 inputs."""
+    passed = True
+    for value in range(8):
+        test = QuantumCircuit(*qc.qregs, *qc.cregs)
+        for i in range(3):
+            if(value >> i & 1):
+                test.x(qc.qubits[i])
+        test.extend(qc)
+        probs = outcome_probabilities(test)
+        total = bin(value).count('1')
+        want = counts_key(test, (total & 1) | (total >> 1) << 1)
+        if(probs.get(want, 0) < 1 - 1e-9):
+            print('ex1a: input A B X = {} {} {} is not added correctly'.format(value & 1, value >> 1 & 1, value >> 2))
+            passed = False
+    if(passed):
+        print('ex1a: correct. Your score is {}.'.format(quantum_cost(qc)))
+    return passed
+
+
+def submit_ex1a(qc):
+    not_submitted('ex1a')
+
+
+def grade_ex1b(ans):
+    """Best iteration count for one marked item among ``2**7``."""
+    passed = ans == optimal_iterations(1 << 7, 1)
+    print('ex1b: correct.' if passed else 'ex1b: {} is not the best iteration count.'.format(ans))
+    return passed
+
+
+def submit_ex1b(ans):
+    not_submitted('ex1b')
+
+
+def prepare_ex2a(solver_func, nvalidation=NVALIDATION, seed=SEED, workers=None):
+    return prepare('ex2a', solver_func, EX2A_LIGHTS, ex2a_answers, random_ex2a, nvalidation, seed, workers)
+
+
+def grade_ex2a(job):
+    return grade(job)
+
+
+def submit_ex2a(job):
+    not_submitted('ex2a')
+
+
+def prepare_ex2b(solver_func, nvalidation=NVALIDATION, seed=SEED, workers=None):
+    return prepare('ex2b', solver_func, EX2B_LIGHTSOUT4, ex2b_answers, random_ex2b, nvalidation, seed, workers)
+
+
+def grade_ex2b(job):
+    return grade(job)
+
+
+def submit_ex2b(job):
+    not_submitted('ex2b')
+
+
+def prepare_ex3(solver_func, nvalidation=NVALIDATION, seed=SEED, workers=None):
+    return prepare('ex3', solver_func, EX3_PROBLEM_SET, ex3_answers, random_ex3, nvalidation, seed, workers)
+
+
+def grade_ex3(job):
+    return grade(job)
+
+
+def submit_ex3(job):
+    not_submitted('ex3')
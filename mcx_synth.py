@@ -0,0 +1,123 @@
+"""Cost-aware synthesis of multi-controlled X gates.
+
+The exercises hardcode ``mode='basic'`` (or no mode at all, i.e. the
+exponential no-ancilla decomposition) at every ``mcx`` / ``mct`` call.
+``auto_mcx`` looks at the qubits that are actually available at the call site
+and picks the decomposition with the lowest ``u3 + 10 * cx`` cost:
+
+- ``noancilla``: Gray-code construction, no ancilla;
+- ``recursion``: one ancilla (clean or dirty) from 5 controls on;
+- ``v-chain``: Toffoli chain on ``n - 2`` clean ancillas;
+- ``v-chain-dirty``: Toffoli chain on ``n - 2`` ancillas in any state;
+- ``rccx-chain``: like ``v-chain`` but the chain is computed and uncomputed
+  with relative-phase Toffolis (RCCX); the phases cancel because the
+  uncompute is the exact inverse of the compute.
+
+Clean ancillas must be |0> when the gate runs and are returned to |0>; dirty
+ancillas can be any other qubit the gate does not touch, and are restored.
+"""
+from functools import lru_cache
+
+from qiskit import QuantumCircuit
+
+from qcost import analytic_counts, score
+
+MODES = ('noancilla', 'recursion', 'v-chain', 'v-chain-dirty', 'rccx-chain')
+
+
+def required_ancillas(mode, ncontrol):
+    """``(clean, dirty)`` ancillas ``mode`` needs for ``ncontrol`` controls."""
+    if(mode == 'noancilla'):
+        return 0, 0
+    if(mode == 'recursion'):
+        return 0, int(ncontrol >= 5)
+    if(mode in ('v-chain', 'rccx-chain')):
+        return ncontrol - 2, 0
+    if(mode == 'v-chain-dirty'):
+        return 0, ncontrol - 2
+    raise ValueError('unknown mcx mode {!r}'.format(mode))
+
+
+def rccx_chain(qc, controls, target, ancilla):
+    """MCX through a relative-phase Toffoli chain on ``len(controls) - 2`` clean ancillas."""
+    n = len(controls)
+    chain = QuantumCircuit(*qc.qregs)
+    chain.rccx(controls[0], controls[1], ancilla[0])
+    for i in range(2, n - 1):
+        chain.rccx(controls[i], ancilla[i - 2], ancilla[i - 1])
+    qc.extend(chain)
+    qc.ccx(controls[-1], ancilla[n - 3], target)
+    qc.extend(chain.inverse())
+
+
+def emit_mcx(qc, controls, target, mode, clean=(), dirty=()):
+    """Append an MCX decomposed with ``mode``, taking ancillas from ``clean`` then ``dirty``."""
+    controls = list(controls)
+    n = len(controls)
+    if(n == 0):
+        qc.x(target)
+        return
+    if(n == 1):
+        qc.cx(controls[0], target)
+        return
+    if(n == 2):
+        qc.ccx(controls[0], controls[1], target)
+        return
+    nclean, ndirty = required_ancillas(mode, n)
+    clean = list(clean)
+    anc = clean[:nclean] + (clean[nclean:] + list(dirty))[:ndirty]
+    if(len(anc) < nclean + ndirty):
+        raise ValueError('mcx mode {!r} with {} controls needs {} clean and {} dirty ancillas'.format(
+            mode, n, nclean, ndirty))
+    if(mode == 'rccx-chain'):
+        rccx_chain(qc, controls, target, anc)
+    else:
+        qc.mcx(controls, target, anc or None, mode=mode)
+
+
+@lru_cache(maxsize=None)
+def mcx_cost(ncontrol, mode):
+    """Exact ``(n_u3, n_cx)`` of an MCX with ``ncontrol`` controls decomposed with ``mode``."""
+    nclean, ndirty = required_ancillas(mode, ncontrol) if ncontrol > 2 else (0, 0)
+    qc = QuantumCircuit(ncontrol + 1 + nclean + ndirty)
+    ctrl = qc.qubits[:ncontrol]
+    anc = qc.qubits[ncontrol + 1:]
+    emit_mcx(qc, ctrl, qc.qubits[ncontrol], mode, anc[:nclean], anc[nclean:])
+    return analytic_counts(qc)
+
+
+def choose_mode(ncontrol, nclean=0, ndirty=0):
+    """``(mode, (n_u3, n_cx))`` of the cheapest decomposition the ancillas allow.
+
+    Clean ancillas can stand in for dirty ones, not the other way round.
+    Up to two controls there is nothing to choose: X, CX or CCX.
+    """
+    if(ncontrol <= 2):
+        return 'noancilla', mcx_cost(ncontrol, 'noancilla')
+    options = []
+    for mode in MODES:
+        need_clean, need_dirty = required_ancillas(mode, ncontrol)
+        if(need_clean <= nclean and need_dirty <= nclean - need_clean + ndirty):
+            options.append((mode, mcx_cost(ncontrol, mode)))
+    return min(options, key=lambda o: score(*o[1]))
+
+
+def auto_mcx(qc, controls, target, clean=(), dirty=None):
+    """Append the cheapest MCX for the ancillas available here; returns the mode used.
+
+    ``clean`` are qubits known to be |0> at this point. ``dirty=None`` offers
+    every other qubit of ``qc`` as a dirty ancilla; pass ``()`` to forbid that.
+    """
+    controls = list(controls)
+    if(len(controls) <= 2):
+        emit_mcx(qc, controls, target, 'noancilla')
+        return 'noancilla'
+    clean = [q for q in clean if q not in controls and q != target]
+    if(dirty is None):
+        busy = set(controls) | set(clean) | {target}
+        dirty = [q for q in qc.qubits if q not in busy]
+    else:
+        dirty = [q for q in dirty if q not in controls and q != target and q not in clean]
+    mode, _ = choose_mode(len(controls), len(clean), len(dirty))
+    emit_mcx(qc, controls, target, mode, clean, dirty)
+    return mode
@@ -0,0 +1,215 @@
+"""Search for the cheapest Week3 oracle.
+
+Week3 is scored on ``u3 + 10 * cx`` alone under fixed rules (28 qubits, one
+Grover iteration), so the construction is picked by search over the options
+of ``asteroids_circuits.build_week3`` (``SPACE``):
+
+1. every combination is costed with a cost model that is exact but builds
+   little: the circuit on empty boards (loader emits nothing) is costed once
+   per option set and the two loader passes once per problem set and loader,
+   both with ``qcost``'s memoized counts;
+2. candidates over the qubit limit are dropped, and the rest are simulated
+   with ``sparse_sim`` on the original and random problem sets
+   (``problems.random_ex3``) on a process pool, cheapest and smallest first.
+   The success margin of a candidate is its worst ``p(answer) - p(runner-up)``
+   over the problem sets, negative if it answers wrong somewhere;
+3. no correct construction beats one iteration of Grover with an exact
+   oracle, so once a candidate reaches that margin every candidate with more
+   cost and qubits is skipped without simulating it.
+
+The result keeps every simulated candidate and the Pareto front of cost vs
+qubits vs margin.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+from asteroids import SIZE
+from asteroids_circuits import (KICKBACKS, LOADERS, build_week3, load_cells, loader_ancillas, week3_registers,
+                                week3_table)
+from grover_planner import success_probability
+from problems import EX3_PROBLEM_SET, ex3_answers, random_ex3
+from qcost import analytic_counts, score
+from sparse_sim import outcome_probabilities
+
+SPACE = {
+    'loader': LOADERS,
+    'degree': (4, 6, 7),
+    'kickback': KICKBACKS,
+    'nfactor': (0, 1, 2, 3, 4),
+    'nancilla': (0, 2, 3, 4, 6, 8),
+    'dirty': (True, False),
+}
+MAX_QUBITS = 28
+# margins closer than this to the best possible one count as reaching it
+TOL = 1e-9
+
+
+def naddress_for(nboard):
+    return max(1, int(np.ceil(np.log2(nboard))))
+
+
+def spec_ancillas(spec, naddress):
+    """Clean ancillas ``build_week3(**spec)`` allocates."""
+    need = max(loader_ancillas(spec.get('loader', 'unary'), naddress), spec.get('nfactor', 0))
+    return need if spec.get('nancilla') is None else spec['nancilla']
+
+
+def candidates(space=SPACE, naddress=4):
+    """Every option set of ``space`` whose ancillas fit the loader and the factors."""
+    keys = list(space)
+    for values in product(*(space[k] for k in keys)):
+        spec = dict(zip(keys, values))
+        need = max(loader_ancillas(spec.get('loader', 'unary'), naddress), spec.get('nfactor', 0))
+        if(spec_ancillas(spec, naddress) >= need):
+            yield spec
+
+
+def spec_key(spec):
+    return tuple(sorted(spec.items()))
+
+
+@lru_cache(maxsize=None)
+def frame_counts(nboard, key):
+    """``(n_u3, n_cx)`` of everything but the loader (the circuit built on empty boards).
+
+    ``key`` is ``spec_key`` of a spec without loader and with ``nancilla`` set.
+    No loader emits a gate on empty boards; ``gray`` is the one that needs no ancilla.
+    """
+    return analytic_counts(build_week3([[]] * nboard, loader='gray', **dict(key)))
+
+
+@lru_cache(maxsize=None)
+def loader_counts(table, loader, nancilla, size):
+    """``(n_u3, n_cx)`` of one loader pass over the qRAM rows ``table``."""
+    qc, r_address, r_cells, _, ancilla = week3_registers(naddress_for(len(table)), nancilla=nancilla, size=size)
+    load_cells(qc, loader, r_address, r_cells, [list(row) for row in table], ancilla)
+    return analytic_counts(qc)
+
+
+def spec_qubits(spec, nboard, size=SIZE):
+    naddress = naddress_for(nboard)
+    return naddress + size * size + (spec.get('kickback') == 'oracle') + spec_ancillas(spec, naddress)
+
+
+def spec_cost(problem_set, spec, size=SIZE):
+    """``u3 + 10 * cx`` of ``build_week3(problem_set, **spec)``, from the cached parts."""
+    table = tuple(tuple(row) for row in week3_table(problem_set, size))
+    nancilla = spec_ancillas(spec, naddress_for(len(table)))
+    frame = {k: v for k, v in spec.items() if k != 'loader'}
+    frame['nancilla'] = nancilla
+    n_u3, n_cx = frame_counts(len(table), spec_key(frame))
+    l_u3, l_cx = loader_counts(table, spec.get('loader', 'unary'), nancilla, size)
+    return score(n_u3 + 2 * l_u3, n_cx + 2 * l_cx)
+
+
+def margin(spec, problem_set, answers):
+    """``p(answer) - p(runner-up)`` of ``build_week3(problem_set, **spec)``; errors are returned, not raised."""
+    try:
+        probs = outcome_probabilities(build_week3(problem_set, **spec))
+    except Exception as err:
+        return '{}: {}'.format(type(err).__name__, err)
+    right = max([probs.get(k, 0.0) for k in answers])
+    wrong = max([p for k, p in probs.items() if k not in answers] + [0.0])
+    return right - wrong
+
+
+def _margin(args):
+    return margin(*args)
+
+
+def dominates(a, b):
+    """Whether candidate ``a`` is at least as good as ``b`` everywhere and better somewhere."""
+    x = (a['cost'], a['qubits'], -a['margin'])
+    y = (b['cost'], b['qubits'], -b['margin'])
+    return all(u <= v for u, v in zip(x, y)) and x != y
+
+
+def pareto(rows):
+    """Rows of ``rows`` no other row dominates, the first of each tie."""
+    front = []
+    seen = set()
+    for r in rows:
+        point = (r['cost'], r['qubits'], r['margin'])
+        if(point not in seen and not any(dominates(o, r) for o in rows)):
+            front.append(r)
+            seen.add(point)
+    return front
+
+
+def search(problem_set=EX3_PROBLEM_SET, space=SPACE, nvalidation=8, seed=None, workers=None,
+           max_qubits=MAX_QUBITS):
+    """Cost, simulate and rank the Week3 constructions of ``space``.
+
+    Returns a dict: ``rows`` (every candidate under the qubit limit with
+    ``spec``, ``cost`` on ``problem_set``, ``qubits`` and ``margin``, ``None``
+    if it was never simulated), ``front`` (the Pareto front, cheapest first),
+    ``errors`` and ``best_margin`` (exact one-iteration Grover).
+    """
+    rng = np.random.default_rng(seed)
+    problems = [(problem_set, ex3_answers(problem_set))] + [random_ex3(rng) for _ in range(nvalidation)]
+    nboard = len(problem_set)
+    best = float(success_probability(1, nboard, 1))
+    best_margin = best - (1 - best) / (nboard - 1)
+
+    rows = []
+    for spec in candidates(space, naddress_for(nboard)):
+        qubits = spec_qubits(spec, nboard)
+        if(qubits <= max_qubits):
+            rows.append({'spec': spec, 'cost': spec_cost(problem_set, spec), 'qubits': qubits, 'margin': None})
+    rows.sort(key=lambda r: (r['cost'], r['qubits']))
+
+    errors = {}
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            exact = [r for r in rows if r['margin'] is not None and r['margin'] >= best_margin - TOL]
+            batch = [r for r in rows if r['margin'] is None
+                     and not any(e['cost'] <= r['cost'] and e['qubits'] <= r['qubits'] for e in exact)]
+            # simulate the (cost, qubits) front of what is left
+            batch = [r for r in batch if not any(o['cost'] <= r['cost'] and o['qubits'] <= r['qubits']
+                                                 and (o['cost'], o['qubits']) != (r['cost'], r['qubits'])
+                                                 for o in batch)]
+            if(not batch):
+                break
+            jobs = [(r['spec'], p, ok) for r in batch for p, ok in problems]
+            chunksize = max(1, len(jobs) // (4 * workers))
+            results = list(pool.map(_margin, jobs, chunksize=chunksize))
+            for i, r in enumerate(batch):
+                margins = results[i * len(problems):(i + 1) * len(problems)]
+                failed = [m for m in margins if isinstance(m, str)]
+                if(failed):
+                    errors[spec_key(r['spec'])] = failed[0]
+                r['margin'] = -1.0 if failed else min(margins)
+    done = [r for r in rows if r['margin'] is not None]
+    return {
+        'rows': rows,
+        'front': sorted(pareto(done), key=lambda r: (r['cost'], r['qubits'])),
+        'errors': errors,
+        'best_margin': best_margin,
+    }
+
+
+def cheapest(result, min_margin=0.0):
+    """Spec of the cheapest front candidate with a margin above ``min_margin``."""
+    ok = [r for r in result['front'] if r['margin'] > min_margin]
+    if(not ok):
+        raise ValueError('no candidate reaches a margin of {}'.format(min_margin))
+    return min(ok, key=lambda r: (r['cost'], r['qubits']))['spec']
+
+
+def report(result):
+    """Text table of the Pareto front."""
+    done = sum(r['margin'] is not None for r in result['rows'])
+    lines = ['{} candidates, {} simulated, best possible margin {:.4f}'.format(
+        len(result['rows']), done, result['best_margin'])]
+    lines.append('{:>8} {:>6} {:>8}  spec'.format('cost', 'qubits', 'margin'))
+    for r in result['front']:
+        spec = ', '.join('{}={}'.format(k, v) for k, v in r['spec'].items())
+        lines.append('{:>8} {:>6} {:>8.4f}  {}'.format(r['cost'], r['qubits'], r['margin'], spec))
+    for key, err in list(result['errors'].items())[:3]:
+        lines.append('error {}: {}'.format(dict(key), err))
+    return '\n'.join(lines)
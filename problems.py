@@ -0,0 +1,126 @@
+"""Exercise inputs: the notebooks' originals and random inputs of the same kind.
+
+The graders validate every answer function "with different inputs". The
+generators below draw inputs that satisfy the same promise as the originals,
+together with the set of counts keys that count as a correct answer:
+
+- Week2-A: a solvable board; the answer is any push pattern clearing it, in
+  the measured bit order of ``week2a_ans_func`` (switch 0 first);
+- Week2-B: ``nboard`` boards of which exactly one can be cleared with 1 to
+  ``max_push`` pushes; the answer is its index, most significant bit first;
+- Week3: ``nboard`` asteroid boards of which exactly one cannot be cleared
+  with ``nbeam`` beams; the answer is its index with ``c[0]`` the highest bit,
+  i.e. reversed in the counts key.
+"""
+import numpy as np
+
+from asteroids import NBEAM, SIZE, decode, false_board, mask_beams, mask_dtype
+from board import square
+from grover_sim import to_bitstring
+from lightsout import get_solver, to_mask
+
+EX2A_LIGHTS = [0, 1, 1, 1, 0, 0, 1, 1, 1]
+
+EX2B_LIGHTSOUT4 = [[1, 1, 1, 0, 0, 0, 1, 0, 0], [1, 0, 1, 0, 0, 0, 1, 1, 0],
+                   [1, 0, 1, 1, 1, 1, 0, 0, 1], [1, 0, 0, 0, 0, 0, 1, 0, 0]]
+
+EX3_PROBLEM_SET = [
+    [['0', '2'], ['1', '0'], ['1', '2'], ['1', '3'], ['2', '0'], ['3', '3']],
+    [['0', '0'], ['0', '1'], ['1', '2'], ['2', '2'], ['3', '0'], ['3', '3']],
+    [['0', '0'], ['1', '1'], ['1', '3'], ['2', '0'], ['3', '2'], ['3', '3']],
+    [['0', '0'], ['0', '1'], ['1', '1'], ['1', '3'], ['3', '2'], ['3', '3']],
+    [['0', '2'], ['1', '0'], ['1', '3'], ['2', '0'], ['3', '2'], ['3', '3']],
+    [['1', '1'], ['1', '2'], ['2', '0'], ['2', '1'], ['3', '1'], ['3', '3']],
+    [['0', '2'], ['0', '3'], ['1', '2'], ['2', '0'], ['2', '1'], ['3', '3']],
+    [['0', '0'], ['0', '3'], ['1', '2'], ['2', '2'], ['2', '3'], ['3', '0']],
+    [['0', '3'], ['1', '1'], ['1', '2'], ['2', '0'], ['2', '1'], ['3', '3']],
+    [['0', '0'], ['0', '1'], ['1', '3'], ['2', '1'], ['2', '3'], ['3', '0']],
+    [['0', '1'], ['0', '3'], ['1', '2'], ['1', '3'], ['2', '0'], ['3', '2']],
+    [['0', '0'], ['1', '3'], ['2', '0'], ['2', '1'], ['2', '3'], ['3', '1']],
+    [['0', '1'], ['0', '2'], ['1', '0'], ['1', '2'], ['2', '2'], ['2', '3']],
+    [['0', '3'], ['1', '0'], ['1', '3'], ['2', '1'], ['2', '2'], ['3', '0']],
+    [['0', '2'], ['0', '3'], ['1', '2'], ['2', '3'], ['3', '0'], ['3', '1']],
+    [['0', '1'], ['1', '0'], ['1', '2'], ['2', '2'], ['3', '0'], ['3', '1']]]
+
+
+def pushed_board(board, pushes):
+    """Lights (0/1 list) left on by pushing ``pushes`` (bitmask) on an all-off ``board``."""
+    mask = 0
+    for i in range(board.nlight):
+        if(pushes >> i & 1):
+            mask ^= int(board.masks[i])
+    return [mask >> i & 1 for i in range(board.nlight)]
+
+
+def push_count(lights, board):
+    """Fewest pushes clearing ``lights``, ``None`` if it cannot be cleared."""
+    pushes = get_solver(board).min_push(lights)
+    return None if pushes is None else sum(pushes)
+
+
+def ex2a_answers(lights):
+    """Counts keys accepted for the Week2-A board ``lights``."""
+    board = square(len(lights))
+    return {to_bitstring(x, board.nlight) for x in get_solver(board).solutions(lights)}
+
+
+def random_ex2a(rng, nlight=9):
+    """``(lights, answers)`` for a random board that needs at least one push."""
+    board = square(nlight)
+    pushes = int(rng.integers(1, 1 << nlight))
+    lights = pushed_board(board, pushes)
+    return lights, ex2a_answers(lights)
+
+
+def ex2b_answers(lightsout4, max_push=3):
+    """Counts keys accepted for the Week2-B board list ``lightsout4``."""
+    board = square(len(lightsout4[0]))
+    naddress = max(1, int(np.ceil(np.log2(len(lightsout4)))))
+    good = [i for i, lights in enumerate(lightsout4)
+            if 1 <= (push_count(lights, board) or 0) <= max_push]
+    if(len(good) != 1):
+        raise ValueError('expected exactly one board within {} pushes, found {}'.format(max_push, len(good)))
+    return {format(good[0], '0{}b'.format(naddress))}
+
+
+def random_ex2b(rng, nboard=4, nlight=9, max_push=3):
+    """``(lightsout4, answers)``: one board clears with 1..``max_push`` pushes, the rest need more."""
+    board = square(nlight)
+    solver = get_solver(board)
+    answer = int(rng.integers(nboard))
+    boards = []
+    for i in range(nboard):
+        while True:
+            if(i == answer):
+                npush = int(rng.integers(1, max_push + 1))
+                pushes = sum(1 << int(j) for j in rng.choice(nlight, npush, replace=False))
+            else:
+                pushes = int(rng.integers(1, 1 << nlight))
+            lights = pushed_board(board, pushes)
+            count = sum(solver.min_push(lights))
+            if((count <= max_push) == (i == answer) and to_mask(lights)):
+                break
+        boards.append(lights)
+    return boards, ex2b_answers(boards, max_push)
+
+
+def ex3_answers(problem_set, nbeam=NBEAM, size=SIZE):
+    """Counts keys accepted for the Week3 ``problem_set`` (``c[0]`` is the highest bit)."""
+    naddress = max(1, int(np.ceil(np.log2(len(problem_set)))))
+    return {format(false_board(problem_set, nbeam, size), '0{}b'.format(naddress))[::-1]}
+
+
+def random_ex3(rng, nboard=16, nasteroid=6, nbeam=NBEAM, size=SIZE):
+    """``(problem_set, answers)``: exactly one board needs more than ``nbeam`` beams."""
+    answer = int(rng.integers(nboard))
+    masks = np.zeros(nboard, dtype=mask_dtype(size))
+    missing = np.ones(nboard, dtype=bool)
+    while missing.any():
+        # one candidate per board: the first nasteroid cells of a random permutation
+        cells = rng.random((nboard, size * size)).argsort(1)[:, :nasteroid]
+        candidate = (np.uint64(1) << cells.astype(np.uint64)).sum(1, dtype=np.uint64)
+        fit = (mask_beams(candidate, size) <= nbeam) != (np.arange(nboard) == answer)
+        masks[missing & fit] = candidate[missing & fit]
+        missing &= ~fit
+    problem_set = decode(masks, size)
+    return problem_set, ex3_answers(problem_set, nbeam, size)
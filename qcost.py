@@ -0,0 +1,240 @@
+"""Quantum cost as scored by the challenge: ``u3 + 10 * cx`` after unrolling.
+
+Week1-A measures it with ``PassManager(Unroller(['u3', 'cx']))``. Newer
+Terra releases decompose some gates into ``p`` / ``u``, which count as one
+single-qubit gate each, so those are accepted in the basis as well.
+
+Running the Unroller copies the whole circuit into a DAG and expands every
+``mcx`` again, which for the 28-qubit Grover circuits takes longer than
+building them. ``analytic_counts`` walks the instruction list instead and
+looks every gate up in ``COUNTS``, a table of ``(n_u3, n_cx)`` per gate shape
+(class and name, which fix the ``mcx`` mode; width; parameters; control
+state). A missing entry is filled by recursing into the gate definition
+exactly the way the Unroller expands it, so the two always agree.
+"""
+from contextlib import contextmanager
+
+import numpy as np
+from qiskit.circuit import Gate, Instruction
+from qiskit.circuit.controlledgate import ControlledGate
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import Unroller
+
+BASIS = ['u3', 'u', 'p', 'cx']
+CX_WEIGHT = 10
+# left alone by the Unroller and not scored
+DIRECTIVES = ('measure', 'reset', 'barrier', 'snapshot', 'delay')
+
+# gate shape -> (n_u3, n_cx)
+COUNTS = {}
+
+
+def unrolled_counts(qc):
+    """``(n_u3, n_cx)`` of ``qc`` unrolled to single-qubit gates and CX."""
+    ops = PassManager(Unroller(BASIS)).run(qc).count_ops()
+    return ops.get('u3', 0) + ops.get('u', 0) + ops.get('p', 0), ops.get('cx', 0)
+
+
+def gate_key(op):
+    """Key of ``op`` in ``COUNTS``, ``None`` if its definition is not fixed by its shape.
+
+    Anonymous gates (``to_gate`` / ``to_instruction``) and gates with unbound
+    or array parameters are expanded every time.
+    """
+    if(type(op) in (Gate, Instruction)):
+        return None
+    try:
+        params = tuple(float(p) for p in op.params)
+    except (TypeError, ValueError):
+        return None
+    return (type(op), op.name, op.num_qubits, op.num_clbits, params,
+            getattr(op, 'ctrl_state', None), getattr(op, '_dirty_ancillas', None))
+
+
+def gate_counts(op):
+    """``(n_u3, n_cx)`` the Unroller turns ``op`` into."""
+    if(op.name in DIRECTIVES):
+        return 0, 0
+    if(op.name in BASIS and not (isinstance(op, ControlledGate) and op._open_ctrl)):
+        return (0, 1) if op.name == 'cx' else (1, 0)
+    key = gate_key(op)
+    if(key in COUNTS):
+        return COUNTS[key]
+    n_u3 = n_cx = 0
+    for sub, _, _ in op.definition.data:
+        u3, cx = gate_counts(sub)
+        n_u3 += u3
+        n_cx += cx
+    if(key is not None):
+        COUNTS[key] = n_u3, n_cx
+    return n_u3, n_cx
+
+
+def analytic_counts(qc):
+    """``(n_u3, n_cx)`` of ``qc``, equal to ``unrolled_counts(qc)`` without unrolling."""
+    n_u3 = n_cx = 0
+    for op, _, _ in qc.data:
+        u3, cx = gate_counts(op)
+        n_u3 += u3
+        n_cx += cx
+    return n_u3, n_cx
+
+
+def score(n_u3, n_cx):
+    """Challenge score of a gate count."""
+    return n_u3 + CX_WEIGHT * n_cx
+
+
+def quantum_cost(qc):
+    """Challenge score of ``qc``, e.g. ``22 + 15 * 10`` for the Week1-A adder."""
+    return score(*analytic_counts(qc))
+
+
+# longest-path length between wires through the unrolled gate, -GAP if none
+GAP = 1 << 40
+
+# gate shape -> wire-to-wire path lengths
+PATHS = {}
+
+
+def gate_paths(op):
+    """``P[i, j]``: most unrolled gates on a path from wire ``i`` into ``op`` to wire ``j`` out.
+
+    Barriers line their wires up without adding depth, as in
+    ``QuantumCircuit.depth``.
+    """
+    n = op.num_qubits
+    if(op.name in ('barrier', 'snapshot')):
+        return np.zeros((n, n), dtype=np.int64)
+    if(op.name in ('measure', 'reset', 'delay')
+            or op.name in BASIS and not (isinstance(op, ControlledGate) and op._open_ctrl)):
+        return np.ones((n, n), dtype=np.int64)
+    key = gate_key(op)
+    if(key in PATHS):
+        return PATHS[key]
+    definition = op.definition
+    wire = {q: k for k, q in enumerate(definition.qubits)}
+    paths = np.full((n, n), -GAP, dtype=np.int64)
+    np.fill_diagonal(paths, 0)
+    for sub, qargs, _ in definition.data:
+        sub_paths = gate_paths(sub)
+        idx = [wire[q] for q in qargs]
+        paths[:, idx] = (paths[:, idx][:, :, None] + sub_paths[None]).max(axis=1)
+        paths[paths < 0] = -GAP
+    if(key is not None):
+        PATHS[key] = paths
+    return paths
+
+
+class CostLedger:
+    """Running cost profile of a circuit under construction, per labelled region.
+
+    ``mark(label)`` charges every instruction appended from then on to
+    ``label``; ``region(label)`` does the same for a ``with`` block and then
+    goes back to the previous label. A label used several times (e.g. once per
+    Grover iteration) accumulates. New instructions are read off ``qc.data``
+    whenever the label changes or a profile is asked for, and are looked up in
+    ``COUNTS`` / ``PATHS``, so nothing is unrolled.
+
+    Depth is ``depth()`` of the unrolled circuit, counted on the qubit wires
+    only: a region's own depth is that of its instructions alone, the
+    ``total`` row that of the whole circuit so far.
+    """
+
+    def __init__(self, qc=None, label='unlabelled'):
+        self.qc = None
+        self.label = label
+        self.cursor = 0
+        self.regions = {}
+        self.total = self._new_region()
+        if(qc is not None):
+            self.track(qc)
+
+    @staticmethod
+    def _new_region():
+        return {'n_u3': 0, 'n_cx': 0, 'gates': 0, 'qubits': set(), 'levels': {}}
+
+    def track(self, qc):
+        """Follow ``qc``; instructions already in it go to the current label."""
+        self.qc = qc
+        self.cursor = 0
+
+    def _sync(self):
+        if(self.qc is None):
+            return
+        data = self.qc.data
+        if(self.cursor >= len(data)):
+            return
+        region = self.regions.setdefault(self.label, self._new_region())
+        for op, qargs, _ in data[self.cursor:]:
+            u3, cx = gate_counts(op)
+            paths = gate_paths(op)
+            for r in (region, self.total):
+                r['n_u3'] += u3
+                r['n_cx'] += cx
+                if(op.name not in ('barrier', 'snapshot')):
+                    r['gates'] += 1
+                    r['qubits'].update(qargs)
+                levels = r['levels']
+                before = np.array([levels.get(q, 0) for q in qargs], dtype=np.int64)
+                after = (before[:, None] + paths).max(axis=0)
+                for q, level in zip(qargs, after):
+                    levels[q] = int(level)
+        self.cursor = len(data)
+
+    def mark(self, label):
+        """Charge the instructions appended from now on to ``label``."""
+        self._sync()
+        self.label = label
+
+    @contextmanager
+    def region(self, label):
+        """Charge the instructions appended inside the ``with`` block to ``label``."""
+        previous = self.label
+        self.mark(label)
+        try:
+            yield self
+        finally:
+            self.mark(previous)
+
+    @staticmethod
+    def _summary(r):
+        return {
+            'n_u3': r['n_u3'],
+            'n_cx': r['n_cx'],
+            'cost': score(r['n_u3'], r['n_cx']),
+            'depth': max(r['levels'].values(), default=0),
+            'qubits': len(r['qubits']),
+            'gates': r['gates'],
+        }
+
+    def profile(self):
+        """``{label: {n_u3, n_cx, cost, depth, qubits, gates}}`` so far, plus ``'total'``."""
+        self._sync()
+        profile = {label: self._summary(r) for label, r in self.regions.items()}
+        profile['total'] = self._summary(self.total)
+        return profile
+
+    def report(self):
+        """The profile as a text table, regions in the order they first appeared."""
+        profile = self.profile()
+        width = max(len(str(label)) for label in profile)
+        columns = ('n_u3', 'n_cx', 'cost', 'depth', 'qubits', 'gates')
+        lines = ['{:<{}}'.format('region', width) + ''.join('{:>9}'.format(c) for c in columns)]
+        for label, row in profile.items():
+            lines.append('{:<{}}'.format(str(label), width) + ''.join('{:>9}'.format(row[c]) for c in columns))
+        return '\n'.join(lines)
+
+
+class NullLedger:
+    """``CostLedger`` that records nothing: builds nobody profiles skip the bookkeeping."""
+
+    def track(self, qc):
+        pass
+
+    def mark(self, label):
+        pass
+
+    @contextmanager
+    def region(self, label):
+        yield self
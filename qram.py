@@ -0,0 +1,192 @@
+"""qRAM loaders: ``|a>|d> -> |a>|d ^ D_a>`` for a table of bit rows ``D``.
+
+The loader in ``week2b_ans_func`` visits the boards in index order and wraps
+every board in X gates on its zero address bits. ``load_gray`` instead
+
+- splits, per data bit, the set of addresses that flip it into disjoint
+  sub-cubes, so a bit shared by a pair of neighbouring addresses costs one
+  gate with one control fewer (a bit set for every address costs one X);
+- visits the cubes in an order where consecutive cubes differ in as few
+  address polarities as possible (Gray-code order for single addresses),
+  and only emits the X gates for the bits that change in between.
+
+Every loader here is its own inverse, so the same call uncomputes the data.
+"""
+
+
+def address_cubes(addresses, naddress):
+    """Partition ``addresses`` into disjoint cubes ``(care, value)``.
+
+    A cube covers every address ``a`` with ``a & care == value``. Pairs that
+    differ in one cared-for bit are merged until nothing merges any more.
+    """
+    full = (1 << naddress) - 1
+    cubes = {(full, a) for a in addresses}
+    merged = True
+    while merged:
+        merged = False
+        for care, value in sorted(cubes):
+            for bit in range(naddress):
+                b = 1 << bit
+                if(not care & b or value & b):
+                    continue
+                twin = (care, value | b)
+                if((care, value) in cubes and twin in cubes):
+                    cubes -= {(care, value), twin}
+                    cubes.add((care & ~b, value))
+                    merged = True
+                    break
+    return sorted(cubes)
+
+
+def gray_rank(value):
+    """Position of ``value`` in the binary reflected Gray code."""
+    rank = 0
+    while value:
+        rank ^= value
+        value >>= 1
+    return rank
+
+
+def controlled_x(qc, controls, target, ancilla=None, mode='basic'):
+    """X on ``target`` controlled by all of ``controls`` (possibly none)."""
+    if(not controls):
+        qc.x(target)
+    elif(len(controls) == 1):
+        qc.cx(controls[0], target)
+    elif(len(controls) == 2):
+        qc.ccx(controls[0], controls[1], target)
+    else:
+        qc.mcx(controls, target, ancilla, mode=mode)
+
+
+def load_gray(qc, r_address, r_data, table, ancilla=None, mode='basic'):
+    """XOR row ``table[a]`` into ``r_data`` for address ``a``, Gray-code ordered.
+
+    Rows past ``len(table)`` (unused addresses) load nothing.
+    """
+    naddress = len(r_address)
+    if(len(table) > 1 << naddress):
+        raise ValueError('{} rows do not fit {} address qubits'.format(len(table), naddress))
+    # cube -> data bits it flips
+    groups = {}
+    for i in range(len(r_data)):
+        addresses = [a for a, row in enumerate(table) if row[i]]
+        for cube in address_cubes(addresses, naddress):
+            groups.setdefault(cube, []).append(i)
+
+    flipped = 0
+    todo = sorted(groups, key=lambda cube: (gray_rank(cube[1]), cube[0]))
+    while todo:
+        # nearest cube: fewest address polarities to change
+        cube = min(todo, key=lambda c: bin((flipped ^ (c[0] & ~c[1])) & c[0]).count('1'))
+        todo.remove(cube)
+        care, value = cube
+        want = (flipped & ~care) | (care & ~value)
+        for bit in range(naddress):
+            if((flipped ^ want) >> bit & 1):
+                qc.x(r_address[bit])
+        flipped = want
+        controls = [r_address[bit] for bit in range(naddress) if care >> bit & 1]
+        for i in groups[cube]:
+            controlled_x(qc, controls, r_data[i], ancilla, mode)
+    for bit in range(naddress):
+        if(flipped >> bit & 1):
+            qc.x(r_address[bit])
+
+
+def load_naive(qc, r_address, r_data, table, ancilla=None, mode='basic'):
+    """Reference loader in index order, as originally written in ``week2b_ans_func``."""
+    naddress = len(r_address)
+    for a, row in enumerate(table):
+        for bit in range(naddress):
+            if(not (a >> bit & 1)):
+                qc.x(r_address[bit])
+        for i, d in enumerate(row):
+            if(d):
+                qc.mcx(r_address, r_data[i], ancilla, mode=mode)
+        for bit in range(naddress):
+            if(not (a >> bit & 1)):
+                qc.x(r_address[bit])
+
+
+def load_unary(qc, r_address, r_data, table, ancilla):
+    """XOR row ``table[a]`` into ``r_data`` by unary iteration over the addresses.
+
+    Walks a binary tree over the address bits, most significant first. Each
+    internal node holds ``parent AND (bit == side)`` in one ancilla per level,
+    so the whole table costs about ``2 * len(table)`` Toffolis, whatever the
+    address width. Switching from the left to the right child is a single CX,
+    and a data bit set in every row of a subtree is written once from that
+    subtree's node.
+
+    Subtrees without data, including addresses past ``len(table)``, are
+    skipped, so the number of rows need not be a power of two. Needs
+    ``len(r_address) - 1`` clean ancillas, returned clean.
+    """
+    naddress = len(r_address)
+    if(len(table) > 1 << naddress):
+        raise ValueError('{} rows do not fit {} address qubits'.format(len(table), naddress))
+    if(naddress > 1 and len(ancilla) < naddress - 1):
+        raise ValueError('unary iteration needs {} ancillas, {} given'.format(naddress - 1, len(ancilla)))
+    ndata = len(r_data)
+    rows = [list(row) for row in table]
+
+    def shared(lo, hi):
+        """Data bits set in every row of ``[lo, hi)`` (rows past the table count as 0)."""
+        if(hi > len(rows)):
+            return set()
+        return {i for i in range(ndata) if all(rows[a][i] for a in range(lo, hi))}
+
+    def pending(lo, hi, done):
+        """Whether rows ``[lo, hi)`` still have a bit to write."""
+        return any(d and i not in done for row in rows[lo:hi] for i, d in enumerate(row))
+
+    def write(node, lo, hi, done):
+        """Write rows ``[lo, hi)`` given ``node`` is 1 iff the address is in range.
+
+        ``node=None`` stands for the root, where every address is in range.
+        """
+        for i in sorted(shared(lo, hi) - done):
+            if(node is None):
+                qc.x(r_data[i])
+            else:
+                qc.cx(node, r_data[i])
+        done = done | shared(lo, hi)
+        if(hi - lo == 1):
+            return
+        level = (hi - lo).bit_length() - 2
+        mid = (lo + hi) // 2
+        bit = r_address[level]
+        left = pending(lo, mid, done)
+        right = pending(mid, hi, done)
+        if(node is None):
+            # root: the top address bit itself is the node qubit
+            if(left):
+                qc.x(bit)
+                write(bit, lo, mid, done)
+                qc.x(bit)
+            if(right):
+                write(bit, mid, hi, done)
+            return
+        child = ancilla[level]
+        if(left):
+            qc.x(bit)
+            qc.ccx(node, bit, child)
+            qc.x(bit)
+            write(child, lo, mid, done)
+            if(not right):
+                qc.x(bit)
+                qc.ccx(node, bit, child)
+                qc.x(bit)
+                return
+            # node & ~bit  ->  node & bit
+            qc.cx(node, child)
+        elif(right):
+            qc.ccx(node, bit, child)
+        else:
+            return
+        write(child, mid, hi, done)
+        qc.ccx(node, bit, child)
+
+    write(None, 0, 1 << naddress, frozenset())
@@ -0,0 +1,157 @@
+"""Bit-parallel simulation of classical reversible circuits.
+
+The adders of Week1-A, the qRAM loaders and push toggles of Week2-B and the
+``is_off`` compute blocks of Week2-A only use X, CX, CCX and MCX, so on a
+basis-state input they act as a permutation of bit strings. Instead of one
+``execute`` per input, every qubit is held as a bit plane: ``planes[q, w]`` is
+a ``uint64`` whose bit ``j`` is the value of qubit ``q`` for input
+``64 * w + j``. Each gate is then one AND over its control planes and one XOR
+into its target plane, for 64 inputs per machine word.
+
+Any ``mcx`` mode is simulated as the ideal gate: the ancillas it was given are
+left untouched. RCCX / RC3X flip the same bits as CCX / C3X, up to phases that
+do not matter on basis states, and are accepted as such; so are Y / CY, and
+diagonal gates are skipped.
+
+With ``branch=True`` a single-qubit gate that creates a superposition (H, a
+rotation) is kept as a branch point: every input then follows one random
+computational-basis path through it, which is how ``uncompute`` checks whole
+Grover circuits.
+"""
+import numpy as np
+
+WORD = 64
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+# gates acting as "target ^= AND(controls)" on basis states
+MCX_NAMES = ('x', 'cx', 'ccx', 'c3x', 'c4x', 'mcx', 'mcx_gray', 'mcx_recursive', 'mcx_vchain',
+             'rccx', 'rccx_dg', 'rcccx', 'rcccx_dg', 'y', 'cy')
+# a phase on basis states
+DIAGONAL = ('id', 'z', 's', 'sdg', 't', 'tdg', 'u1', 'p', 'rz', 'cz', 'cu1', 'cp', 'crz', 'mcu1', 'mcp')
+# single-qubit gates that turn a basis state into a superposition
+BRANCHING = ('h', 'rx', 'ry', 'u2', 'u3', 'u', 'sx', 'sxdg')
+IGNORED = ('barrier', 'measure', 'snapshot', 'delay')
+
+
+def compile_circuit(qc, branch=False):
+    """``[(position, controls, negated, target)]`` for ``qc``, qubits as indices into ``qc.qubits``.
+
+    ``position`` is the index of the gate in ``qc.data`` and ``negated`` lists
+    the open controls; ``controls=None`` marks a branch point. Raises
+    ``ValueError`` on any other gate.
+    """
+    index = {q: i for i, q in enumerate(qc.qubits)}
+    ops = []
+    for position, (op, qargs, _) in enumerate(qc.data):
+        if(op.name in IGNORED or op.name in DIAGONAL and op.condition is None):
+            continue
+        if(branch and op.name in BRANCHING and op.condition is None):
+            ops.append((position, None, (), index[qargs[0]]))
+            continue
+        if(op.name not in MCX_NAMES or op.condition is not None):
+            raise ValueError('{!r} is not a classical reversible gate'.format(op.name))
+        # mcx ancillas, if any, come after the target
+        nctrl = getattr(op, 'num_ctrl_qubits', op.num_qubits - 1)
+        controls = tuple(index[q] for q in qargs[:nctrl])
+        state = getattr(op, 'ctrl_state', (1 << nctrl) - 1)
+        negated = tuple(c for k, c in enumerate(controls) if not state >> k & 1)
+        ops.append((position, controls, negated, index[qargs[nctrl]]))
+    return ops
+
+
+def run_planes(ops, planes, rng=None, trace=None):
+    """Apply compiled ``ops`` in place to ``planes`` (``nqubit x nword`` uint64).
+
+    Branch points draw fresh random bits from ``rng``. ``trace(position,
+    target, planes)`` is called after every gate, if given.
+    """
+    scratch = np.empty(planes.shape[1], dtype=np.uint64)
+    for position, controls, negated, target in ops:
+        if(controls is None):
+            if(rng is None):
+                raise ValueError('branch points need an rng')
+            planes[target] = rng.integers(0, 1 << 64, size=planes.shape[1], dtype=np.uint64)
+        elif(not controls):
+            np.invert(planes[target], out=planes[target])
+        else:
+            for k, c in enumerate(controls):
+                if(k == 0):
+                    np.copyto(scratch, planes[c])
+                    if(c in negated):
+                        np.invert(scratch, out=scratch)
+                elif(c in negated):
+                    np.bitwise_and(scratch, ~planes[c], out=scratch)
+                else:
+                    np.bitwise_and(scratch, planes[c], out=scratch)
+            np.bitwise_xor(planes[target], scratch, out=planes[target])
+        if(trace is not None):
+            trace(position, target, planes)
+    return planes
+
+
+def pack(values, nbit):
+    """Bit planes ``(nbit, nword)`` of the integers ``values`` (bit ``q`` -> plane ``q``)."""
+    values = np.asarray(values, dtype=np.uint64)
+    nword = -(-len(values) // WORD)
+    padded = np.zeros(nword * WORD, dtype=np.uint64)
+    padded[:len(values)] = values
+    bits = ((padded[None, :] >> np.arange(nbit, dtype=np.uint64)[:, None]) & np.uint64(1)).astype(np.uint8)
+    packed = np.packbits(bits, axis=1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').astype(np.uint64)
+
+
+def unpack(planes, ninput):
+    """Integers (uint64) held by ``planes`` for the first ``ninput`` inputs; inverse of ``pack``."""
+    planes = np.asarray(planes, dtype=np.uint64)
+    if(len(planes) > WORD):
+        raise ValueError('{} bits do not fit a uint64'.format(len(planes)))
+    raw = np.ascontiguousarray(planes.astype('<u8')).view(np.uint8)
+    bits = np.unpackbits(raw, axis=1, bitorder='little')[:, :ninput]
+    values = np.zeros(ninput, dtype=np.uint64)
+    for q, row in enumerate(bits):
+        values |= row.astype(np.uint64) << np.uint64(q)
+    return values
+
+
+def counting_planes(nbit):
+    """Bit planes of ``0 .. 2**nbit - 1``, built word by word without packing."""
+    nword = max(1, (1 << nbit) // WORD)
+    planes = np.empty((nbit, nword), dtype=np.uint64)
+    words = np.arange(nword)
+    for b in range(nbit):
+        if(b < 6):
+            # the same 64-bit pattern in every word
+            pattern = sum(1 << j for j in range(WORD) if j >> b & 1)
+            planes[b] = np.uint64(pattern)
+        else:
+            planes[b] = np.where(words >> (b - 6) & 1, ALL, np.uint64(0))
+    return planes
+
+
+def simulate(qc, inputs):
+    """Output basis state of ``qc`` for every input basis state (integers, qubit ``i`` = bit ``i``)."""
+    if(qc.num_qubits > WORD):
+        raise ValueError('use run_planes for circuits wider than {} qubits'.format(WORD))
+    planes = pack(inputs, qc.num_qubits)
+    run_planes(compile_circuit(qc), planes)
+    return unpack(planes, len(inputs))
+
+
+def truth_table(qc, qubits):
+    """Output planes of ``qc`` for every assignment of ``qubits`` (other qubits start at 0).
+
+    Input ``k`` sets ``qubits[i]`` to bit ``i`` of ``k``; returns the
+    ``(num_qubits, nword)`` planes, to be read with ``unpack`` on the rows of
+    interest (or compared plane by plane).
+    """
+    index = {q: i for i, q in enumerate(qc.qubits)}
+    counting = counting_planes(len(qubits))
+    planes = np.zeros((qc.num_qubits, counting.shape[1]), dtype=np.uint64)
+    for q, plane in zip(qubits, counting):
+        planes[index[q]] = plane
+    return run_planes(compile_circuit(qc), planes)
+
+
+def register_values(planes, qc, qubits, ninput):
+    """Integer held by ``qubits`` (``qubits[i]`` = bit ``i``) for the first ``ninput`` inputs."""
+    index = {q: i for i, q in enumerate(qc.qubits)}
+    return unpack(planes[[index[q] for q in qubits]], ninput)
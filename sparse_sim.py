@@ -0,0 +1,161 @@
+"""Sparse statevector simulation of the exercise circuits.
+
+The Week2/Week3 circuits use up to 28 qubits, but only the search registers
+are ever in superposition: ``is_off``, the counters and the ancillas are
+computed reversibly from them. The state is kept as the list of basis states
+with a non-zero amplitude (``uint64`` indices, qubit ``q`` = bit ``q``), so
+its size is bounded by the search space, not by ``2**num_qubits``:
+
+- X / CX / CCX / MCX permute the basis states and are applied to the whole
+  index array with one mask test;
+- diagonal single-qubit gates multiply amplitudes by a phase;
+- any other single-qubit gate splits every basis state in two, and equal
+  indices are merged again (this is where interference happens);
+- everything else is expanded through its definition.
+
+Only exact gates are taken as ideal: ``mcx`` in ``v-chain`` mode and the
+relative-phase Toffolis are expanded, so an ancilla that is not clean, or a
+phase that does not cancel, shows up in the result as it would on a
+simulator.
+"""
+import numpy as np
+
+# exact multi-controlled X whatever state their ancillas are in
+MCX_NAMES = ('x', 'cx', 'ccx', 'c3x', 'c4x', 'mcx', 'mcx_gray', 'mcx_recursive')
+IGNORED = ('barrier', 'snapshot', 'delay', 'id')
+# amplitudes below this are dropped after a merge
+ATOL = 1e-12
+
+
+class SparseState:
+    """Basis states ``index`` with amplitudes ``amp`` of a ``nqubit`` register."""
+
+    def __init__(self, nqubit):
+        if(nqubit > 64):
+            raise ValueError('{} qubits do not fit a uint64 index'.format(nqubit))
+        self.nqubit = nqubit
+        self.index = np.zeros(1, dtype=np.uint64)
+        self.amp = np.ones(1, dtype=complex)
+
+    def __len__(self):
+        return len(self.index)
+
+    def mcx(self, controls, target, ctrl_state=None):
+        """``target ^= AND(controls)``, ``ctrl_state`` bit ``k`` = wanted value of ``controls[k]``."""
+        care = 0
+        value = 0
+        for k, c in enumerate(controls):
+            care |= 1 << c
+            if(ctrl_state is None or ctrl_state >> k & 1):
+                value |= 1 << c
+        hit = (self.index & np.uint64(care)) == np.uint64(value)
+        self.index[hit] ^= np.uint64(1 << target)
+
+    def apply_1q(self, matrix, q):
+        """Apply the 2x2 ``matrix`` to qubit ``q``."""
+        bit = np.uint64(1 << q)
+        b = ((self.index >> np.uint64(q)) & np.uint64(1)).astype(np.intp)
+        if(matrix[0, 1] == 0 and matrix[1, 0] == 0):
+            self.amp = self.amp * np.diag(matrix)[b]
+            return
+        if(matrix[0, 0] == 0 and matrix[1, 1] == 0):
+            self.amp = self.amp * matrix[1 - b, b]
+            self.index = self.index ^ bit
+            return
+        base = self.index & ~bit
+        index = np.concatenate([base, base | bit])
+        amp = np.concatenate([matrix[0, b] * self.amp, matrix[1, b] * self.amp])
+        self.index, inverse = np.unique(index, return_inverse=True)
+        self.amp = (np.bincount(inverse, amp.real, len(self.index))
+                    + 1j * np.bincount(inverse, amp.imag, len(self.index)))
+        keep = np.abs(self.amp) > ATOL
+        self.index = self.index[keep]
+        self.amp = self.amp[keep]
+
+    def apply(self, op, qubits):
+        """Apply instruction ``op`` on qubit indices ``qubits``."""
+        if(op.name in IGNORED):
+            return
+        if(op.condition is not None):
+            raise ValueError('classically controlled {!r} is not supported'.format(op.name))
+        if(op.name in MCX_NAMES or op.name == 'mcx_vchain' and op._dirty_ancillas):
+            nctrl = getattr(op, 'num_ctrl_qubits', 0)
+            self.mcx(qubits[:nctrl], qubits[nctrl], getattr(op, 'ctrl_state', None))
+            return
+        if(len(qubits) == 1 and op.name != 'measure' and op.name != 'reset'):
+            try:
+                matrix = op.to_matrix()
+            except Exception:
+                matrix = None
+            if(matrix is not None):
+                self.apply_1q(np.asarray(matrix, dtype=complex), qubits[0])
+                return
+        if(op.definition is None):
+            raise ValueError('cannot simulate {!r}'.format(op.name))
+        wire = {q: k for k, q in enumerate(op.definition.qubits)}
+        for sub, qargs, _ in op.definition.data:
+            self.apply(sub, [qubits[wire[q]] for q in qargs])
+
+    def probabilities(self):
+        """``(index, probability)`` of every basis state in the support."""
+        return self.index, np.abs(self.amp) ** 2
+
+
+def run_sparse(qc):
+    """Run ``qc`` from |0...0>; returns ``(state, measured)``.
+
+    ``measured`` maps clbit position to qubit position. Measurements must come
+    after every gate on the measured qubit.
+    """
+    qubit_index = {q: i for i, q in enumerate(qc.qubits)}
+    clbit_index = {c: i for i, c in enumerate(qc.clbits)}
+    state = SparseState(qc.num_qubits)
+    measured = {}
+    done = set()
+    for op, qargs, cargs in qc.data:
+        qubits = [qubit_index[q] for q in qargs]
+        if(op.name == 'measure'):
+            measured[clbit_index[cargs[0]]] = qubits[0]
+            done.add(qubits[0])
+            continue
+        if(op.name == 'barrier'):
+            continue
+        if(done.intersection(qubits)):
+            raise ValueError('{!r} acts on a measured qubit'.format(op.name))
+        state.apply(op, qubits)
+    return state, measured
+
+
+def outcome_probabilities(qc):
+    """``{counts key: probability}`` of the measured classical registers of ``qc``."""
+    state, measured = run_sparse(qc)
+    index, prob = state.probabilities()
+    outcome = np.zeros(len(index), dtype=np.uint64)
+    for clbit, qubit in measured.items():
+        outcome |= ((index >> np.uint64(qubit)) & np.uint64(1)) << np.uint64(clbit)
+    values, inverse = np.unique(outcome, return_inverse=True)
+    total = np.bincount(inverse, prob, len(values))
+    return {counts_key(qc, int(v)): p for v, p in zip(values, total)}
+
+
+def counts_key(qc, value):
+    """Key of ``result.get_counts()`` for clbit values ``value`` (clbit ``i`` = bit ``i``).
+
+    Registers are printed last one first, each most significant bit first,
+    separated by spaces, as Qiskit does.
+    """
+    words = []
+    offset = 0
+    for creg in qc.cregs:
+        words.append(''.join(str(value >> (offset + i) & 1) for i in reversed(range(creg.size))))
+        offset += creg.size
+    return ' '.join(reversed(words))
+
+
+def sample_counts(qc, shots=8000, seed=None):
+    """``result.get_counts()`` of ``shots`` runs of ``qc``, drawn from the exact distribution."""
+    probs = outcome_probabilities(qc)
+    keys = list(probs)
+    p = np.array([probs[k] for k in keys])
+    hits = np.random.default_rng(seed).multinomial(shots, p / p.sum())
+    return {k: int(h) for k, h in zip(keys, hits) if h}
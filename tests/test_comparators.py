@@ -0,0 +1,44 @@
+import pytest
+from qiskit import QuantumCircuit, QuantumRegister
+
+from comparators import CONSTRUCTIONS, at_most, in_range, popcount_ancillas
+from revsim import register_values, truth_table
+
+
+def predicate_table(build, n, construction):
+    r_input = QuantumRegister(n, 'input')
+    r_target = QuantumRegister(1, 'target')
+    nancilla = popcount_ancillas(construction, n)
+    qc = QuantumCircuit(r_input, r_target)
+    r_ancilla = []
+    if(nancilla):
+        r_ancilla = QuantumRegister(nancilla, 'ancilla')
+        qc.add_register(r_ancilla)
+    build(qc, r_input, r_target[0], r_ancilla, construction)
+    planes = truth_table(qc, list(r_input))
+    ninput = 1 << n
+    assert list(register_values(planes, qc, list(r_input), ninput)) == list(range(ninput))
+    if(nancilla):
+        assert not register_values(planes, qc, list(r_ancilla), ninput).any()
+    return [int(v) for v in register_values(planes, qc, [r_target[0]], ninput)]
+
+
+@pytest.mark.parametrize('construction', sorted(CONSTRUCTIONS))
+@pytest.mark.parametrize('n', [1, 3, 4])
+def test_at_most_n_accepts_every_count(n, construction):
+    table = predicate_table(lambda qc, i, t, a, c: at_most(qc, i, t, n, a, c), n, construction)
+    assert table == [1] * (1 << n)
+
+
+@pytest.mark.parametrize('construction', sorted(CONSTRUCTIONS))
+@pytest.mark.parametrize('k', [0, 1, 2, 5])
+def test_at_most_matches_popcount(k, construction):
+    n = 4
+    table = predicate_table(lambda qc, i, t, a, c: at_most(qc, i, t, k, a, c), n, construction)
+    assert table == [int(bin(x).count('1') <= k) for x in range(1 << n)]
+
+
+@pytest.mark.parametrize('construction', sorted(CONSTRUCTIONS))
+def test_in_range_covering_every_count(construction):
+    table = predicate_table(lambda qc, i, t, a, c: in_range(qc, i, t, 0, 3, a, c), 3, construction)
+    assert table == [1] * 8
@@ -0,0 +1,109 @@
+"""Check that scratch registers are uncomputed.
+
+The Week2-A hint asks for every auxiliary qubit to end in its initial state,
+and ``week2b_ans_func`` relies on ``is_off`` and ``ancilla`` coming back to
+|0> after the qRAM, push toggles and counter, or the phase kickback on the
+search registers is spoiled. Instead of a 28-qubit statevector run,
+``verify_clean`` runs the circuit on many basis-state inputs of the search
+registers at once with ``revsim`` and looks at the clean registers at the end.
+
+Gates that create superpositions (the H of the diffusion steps, the oracle
+qubit in |->) are followed on one random basis path per input. If a clean
+qubit ends at 1 on any path it is not uncomputed; the converse holds unless
+bad paths cancel by interference, which the Week2 circuits do not rely on.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+from revsim import WORD, compile_circuit, counting_planes, pack, run_planes
+
+
+def verify_clean(qc, clean, search=(), nsample=None, seed=None, max_exhaustive=1 << 20, checkpoints=()):
+    """Check that the ``clean`` qubits of ``qc`` end at |0> for every input on ``search``.
+
+    Qubits may be given as indices. Every other qubit starts at |0>. All ``2**len(search)`` inputs are tried
+    if there are at most ``max_exhaustive`` of them and ``nsample`` is not
+    given, otherwise ``nsample`` (default 4096) random ones.
+
+    ``checkpoints`` are positions in ``qc.data`` where the ``clean`` qubits
+    must be |0> as well (before the instruction at that position), e.g. the
+    end of each compute / uncompute pair; the end of the circuit is always one.
+
+    Returns ``None`` if the registers are clean, else the failure at the first
+    checkpoint that fails as a dict: ``checkpoint`` (``len(qc.data)`` for the
+    end), ``qubit``, ``input`` (``search[i]`` = bit ``i``), ``gate`` (index in
+    ``qc.data`` of the last gate before the checkpoint that set the qubit to 1
+    on that input) and ``name`` of that gate.
+    """
+    search = [qc.qubits[q] if isinstance(q, int) else q for q in search]
+    clean = [qc.qubits[q] if isinstance(q, int) else q for q in clean]
+    index = {q: i for i, q in enumerate(qc.qubits)}
+    ops = compile_circuit(qc, branch=True)
+    if(nsample is None and 1 << len(search) <= max_exhaustive):
+        ninput = 1 << len(search)
+        inputs = None
+    else:
+        ninput = nsample or 4096
+        inputs = np.random.default_rng(seed).integers(0, 1 << len(search), size=ninput, dtype=np.uint64)
+
+    def start():
+        if(inputs is None):
+            search_planes = counting_planes(len(search))
+        else:
+            search_planes = pack(inputs, len(search))
+        planes = np.zeros((qc.num_qubits, search_planes.shape[1]), dtype=np.uint64)
+        for q, plane in zip(search, search_planes):
+            planes[index[q]] = plane
+        return planes
+
+    def first_dirty(planes):
+        for q in clean:
+            dirty = planes[index[q]].copy()
+            if(inputs is None and ninput < WORD):
+                dirty &= np.uint64((1 << ninput) - 1)
+            hit = np.flatnonzero(dirty)
+            if(len(hit)):
+                return q, int(hit[0]), int(dirty[hit[0]])
+        return None
+
+    # seed the branch rng from the caller's seed, so the trace pass below replays the same paths
+    branch_seed = np.random.SeedSequence(seed).entropy
+    rng = np.random.default_rng(branch_seed)
+    positions = [op[0] for op in ops]
+    planes = start()
+    done = 0
+    for checkpoint in sorted(set(checkpoints) | {len(qc.data)}):
+        # segments draw from one rng in turn, as a single run would
+        stop = bisect_left(positions, checkpoint)
+        run_planes(ops[done:stop], planes, rng)
+        done = stop
+        failure = first_dirty(planes)
+        if(failure):
+            break
+    else:
+        return None
+
+    q, word, value = failure
+    bit = (value & -value).bit_length() - 1
+    lane = word * WORD + bit
+    target = index[q]
+    # [value after the previous gate on the qubit, last gate that flipped it 0 -> 1]
+    state = [0, None]
+
+    def trace(position, t, planes):
+        if(t != target):
+            return
+        value = int(planes[t, word]) >> bit & 1
+        if(value and not state[0]):
+            state[1] = position
+        state[0] = value
+
+    run_planes(ops[:done], start(), np.random.default_rng(branch_seed), trace)
+    return {
+        'checkpoint': checkpoint,
+        'qubit': q,
+        'input': lane if inputs is None else int(inputs[lane]),
+        'gate': state[1],
+        'name': qc.data[state[1]][0].name,
+    }
@@ -422,6 +422,12 @@ qc.measure(C, c[1])
 
 ##################################
 
+# %%
+# Truth table of the half adder for all inputs at once (bit-parallel, no execute per input).
+from revsim import truth_table, register_values
+planes = truth_table(qc, [A, B])
+print(register_values(planes, qc, [S, C], 4))  # S + 2 C for A B = 00, 10, 01, 11 -> [0 1 1 2]
+
 # %% [markdown]
 # ## <span style="color: red; ">IMPORTANT: How to calculate Quantum Costs using an Unroller</span>
 # There are several ways to evaluate an efficiency of a program (quantum qc). Such as:
@@ -292,58 +292,31 @@ plot_histogram(answer)
 # For example, when running Grover's algorithm on a database with $N = 2^4$, the probabilities obtained by changing the number of iterations are as follows.
 
 # %%
-backend = BasicAer.get_backend('qasm_simulator')
-prob_of_ans = []
-
-for x in range(12):
-    database = QuantumRegister(4)
-    oracle = QuantumRegister(1)
-    auxiliary = QuantumRegister(2) 
-    cr = ClassicalRegister(4)
-    qc = QuantumCircuit(database, oracle, auxiliary, cr)
-    qc.h(database[:])
-    qc.x(oracle[0])
-    qc.h(oracle[0])
-
-
-    for j in range(x):
-    # oracle_4q
-        # search 7: 0111 
-        qc.x(database[0])
-        qc.mct(database[:], oracle[0], auxiliary[:], mode='basic') 
-        qc.x(database[0])
-
-    # diffusion_4q
-        qc.h(database[:])
-        qc.x(database[:])
-        qc.h(database[3])
-        qc.mct(database[0:3], database[3], auxiliary[:], mode='basic')
-        qc.h(database[3])
-        qc.x(database[:])
-        qc.h(database[:])
-
-
-    qc.h(oracle[0])
-    qc.x(oracle[0])
-    qc.measure(database,cr)
-    # Change the endian 
-    qc = qc.reverse_bits() 
-    
-    job = execute(qc, backend=backend, shots=1000, seed_simulator=12345, backend_options={"fusion_enable":True})
-    result = job.result()
-    count = result.get_counts()
-    answer = count['0111']
-    prob_of_ans.append(answer)
+# Sweep the iteration count on a search-register simulation instead of rebuilding
+# and sampling one circuit per count: the state is advanced one oracle + diffusion
+# round at a time and the exact success probability is recorded after each round.
+from grover_sim import grover_sweep
+from grover_planner import success_probability
+
+nqubit = 4
+# search 7: the oracle fires on database[0] = 0, database[1:] = 1 ('0111' after reverse_bits)
+marked = np.zeros(1 << nqubit, dtype=bool)
+marked[0b1110] = True
+success, prob_of_ans = grover_sweep(marked, 11, shots=1000, seed=12345)
 
 
 # %%
 import numpy as np
 import matplotlib.pyplot as plt
-iteration = [i for i in range(12)]
+iteration = np.arange(len(success))
 correct = prob_of_ans
-plt.bar(iteration, correct)
+plt.bar(iteration, correct, label='1000 shots')
+k = np.linspace(0, iteration[-1], 200)
+plt.plot(k, 1000 * success_probability(k, marked.size, marked.sum()), 'r', label=r'$\sin^2((2k+1)\theta)$')
+plt.plot(iteration, 1000 * success, 'k.', label='exact')
 plt.xlabel('# of iteration')
 plt.ylabel('# of times the solution was obtained')
+plt.legend()
 
 # %% [markdown]
 # # Learning Exercise I-B
@@ -75,82 +75,50 @@ from qiskit import QuantumCircuit, ClassicalRegister, QuantumRegister, BasicAer,
 import numpy as np
 lights = [0, 1, 1, 1, 0, 0, 1, 1, 1]
 
+from lightsout_circuits import week2a_circuit
+
 def week2a_ans_func(lights):
-    nlight = len(lights)
-    size = int(np.sqrt(nlight))
-    r_ispush = QuantumRegister(nlight, "is_push")
-    r_isoff = QuantumRegister(nlight, "is_off")
-    r_oracle = QuantumRegister(1, "oracle")
-    cr_measure = ClassicalRegister(nlight, "m")
-    qc = QuantumCircuit(r_ispush, r_isoff, r_oracle, cr_measure)
-
-    push = [[] for _ in range(nlight)]
-    for i in range(nlight):
-        push[i].append(i)
-        if(i % size):
-            push[i].append(i-1)
-        if((i+1) % size):
-            push[i].append(i+1)
-        if(i-size >= 0):
-            push[i].append(i - size)
-        if(i+size < nlight):
-            push[i].append(i+size)
-
-    # nit
-    N = 1 << nlight
-    theta = np.arcsin(2 * np.sqrt(N-1) / N)
-    nit = int(np.arccos(1 / np.sqrt(N)) / theta)
-
-    # Grover
-    qc.x(r_oracle)
-    qc.h(r_ispush)
-    qc.barrier()
-
-    for _ in range(nit):
-
-        ### Oracle ###
-        for i, light in enumerate(lights):
-            if(not light):
-                qc.x(r_isoff[i])
-        qc.barrier()
-
-        for i, q_ispush in enumerate(r_ispush):
-            for j in push[i]:
-                qc.cx([q_ispush], r_isoff[j])
-        qc.barrier()
-        qc.h(r_oracle)
-        qc.mcx([*r_isoff], *r_oracle)
-        qc.h(r_oracle)
-        qc.barrier()
-        for i, q_ispush in enumerate(reversed(r_ispush)):
-            for j in reversed(push[nlight - i - 1]):
-                qc.cx([q_ispush], r_isoff[j])
-        qc.barrier()
-
-        for i, light in enumerate(lights):
-            if(not light):
-                qc.x(r_isoff[i])
-        qc.barrier()
-        ##############
-
-        qc.h(r_ispush)
-        qc.x(r_ispush)
-        qc.h(r_ispush[-1])
-        qc.mcx([*r_ispush[:nlight-1]], r_ispush[-1])
-        qc.h(r_ispush[-1])
-        qc.x(r_ispush)
-        qc.h(r_ispush)
-        qc.barrier()
-    qc.measure(r_ispush[::-1], cr_measure)
-
-    return qc
+    # The push/oracle/diffusion skeleton (see lightsout_circuits.build_week2a) is built
+    # once per board size and cached; only the X gates conditioning on `lights` change.
+    return week2a_circuit(lights)
 
 qc = week2a_ans_func(lights)
 # qc.draw(output='mpl')
 qc.draw()
 
+# %%
+# Classical reference: Gaussian elimination over GF(2) on the same push table.
+# Every bit string in `solver.solutions(lights)` is a correct answer, so the top count of
+# the circuit can be checked without simulating it.
+from lightsout import get_solver, from_mask
+solver = get_solver(len(lights))
+[from_mask(s, len(lights)) for s in solver.solutions(lights)]
+
+# %%
+# Search-register-only simulation: the oracle block is a diagonal phase on the 2^9 push
+# amplitudes, so the measured distribution is reproduced without a 19-qubit statevector.
+from grover_sim import simulate_week2a, top_bitstring
+top_bitstring(simulate_week2a(lights))
+
+# %%
+# Optional light-chasing mode: the first-row pushes determine all the others, so Grover
+# only searches 2^3 patterns. 9 qubits instead of 19, and 5x5 boards fit in 25 qubits.
+from lightsout_circuits import week2a_chase_circuit
+qc_chase = week2a_chase_circuit(lights)
+qc_chase.draw()
+
+# %%
+# Fuzz with random solvable boards on all cores: failure rate, top-count margin, cost spread.
+# A quick run by default; set full_fuzz = True for 1000 inputs (minutes to hours of simulation).
+from fuzz import NINPUT, fuzz, report
+full_fuzz = False
+print(report(fuzz('ex2a', week2a_ans_func, ninput=1000 if full_fuzz else NINPUT)))
+
+
 # %%
 # Submission code
+# Offline, same calls (local simulator, random validation inputs):
+# from local_grader import prepare_ex2a, grade_ex2a, submit_ex2a
 from qc_grader import prepare_ex2a, grade_ex2a, submit_ex2a
 
 # Execute your circuit with following prepare_ex2a() function.
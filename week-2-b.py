@@ -197,48 +197,48 @@ lightsout4=[[1, 1, 1, 0, 0, 0, 1, 0, 0],[1, 0, 1, 0, 0, 0, 1, 1, 0],[1, 0, 1, 1,
 import numpy as np
 import itertools
 from qiskit import QuantumCircuit, ClassicalRegister, QuantumRegister, BasicAer, execute
-
-def week2b_ans_func(lightout4):
+from board import square
+from grover_sim import WEEK2B_MAX_PUSH, WEEK2B_MIN_PUSH, week2b_nit
+from qram import load_unary
+from comparators import in_range
+from mcx_synth import auto_mcx
+from qcost import CostLedger, NullLedger
+
+def week2b_ans_func(lightout4, ledger=None, nit=None):
     ##### Build your cirucuit here
     ####  In addition, please make it a function that can solve the problem even with different inputs (lightout4). We do validation with different inputs.
     debug = False
     nboard = len(lightout4)
-    naddress = int(np.log2(nboard + 1))
+    naddress = max(1, int(np.ceil(np.log2(nboard))))
     nlight = len(lightout4[0])
-    size = int(np.sqrt(nlight))
     
     r_address = QuantumRegister(naddress, 'address')
     r_ispush = QuantumRegister(nlight, 'is_push')
     r_isoff = QuantumRegister(nlight, 'is_off')
     r_oracle = QuantumRegister(1, 'oracle')
-    # r_flag = QuantumRegister(1, 'flag')
     r_ancilla = QuantumRegister(7,'ancilla')
     c_measure = ClassicalRegister(naddress, 'measure')
     c_measure2 = ClassicalRegister(nlight, 'measure2')
     c_measure3 = ClassicalRegister(nlight, 'measure3')
-    c_measure4 = ClassicalRegister(6, 'measure4')
+    c_measure4 = ClassicalRegister(r_ancilla.size, 'measure4')
     c_measure5 = ClassicalRegister(1, 'measure5')
     if(debug):
-        qc = QuantumCircuit(r_address, r_ispush, r_isoff, r_oracle, r_flag, r_ancilla, c_measure,c_measure2,c_measure3,c_measure4, c_measure5)
+        qc = QuantumCircuit(r_address, r_ispush, r_isoff, r_oracle, r_ancilla, c_measure,c_measure2,c_measure3,c_measure4, c_measure5)
     else:
         qc = QuantumCircuit(r_address, r_ispush, r_isoff, r_oracle, r_ancilla, c_measure)
+    # live cost profile per section: pass a CostLedger and print ledger.report()
+    if(ledger is None):
+        ledger = NullLedger()
+    ledger.track(qc)
+    ledger.mark('init')
     
-    push = [[] for _ in range(nlight)]
-    for i in range(nlight):
-        push[i].append(i)
-        if(i % size):
-            push[i].append(i-1)
-        if((i+1) % size):
-            push[i].append(i+1)
-        if(i-size >= 0):
-            push[i].append(i - size)
-        if(i+size < nlight):
-            push[i].append(i + size)  
+    board = square(nlight)
+    push = board.push
+    # qRAM table: is_off[i] is flipped for every light that is off
+    is_off = [[int(not light) for light in lights] for lights in lightout4]
     
-    N = 1 << nlight
-    theta = np.arcsin(2 * np.sqrt(N-1)/ N)
-    Grover_nit = int(np.arccos(1 / np.sqrt(N))/ theta)
-    Grover_nit = 2
+    # nit=None: fewest push rounds per unit of cost at which the address readout is right (grover_sim)
+    Grover_nit = week2b_nit(lightout4) if nit is None else nit
 
     
     qc.h(r_address)
@@ -254,30 +254,24 @@ def week2b_ans_func(lightout4):
     for it in range(Grover_nit):
         
         if it == 0:
-            for i_board in range(nboard):
-                for i_address in range(naddress):
-                    if( not (i_board >> i_address & 1)):
-                        qc.x(r_address[i_address])
-                for i, light in enumerate(lightout4[i_board]):
-                    if(not light):
-                        qc.mcx(r_address,r_isoff[i], r_ancilla, mode = 'basic')
-                for i_address in range(naddress):
-                    if( not (i_board >> i_address & 1)):
-                        qc.x(r_address[i_address])
+            ledger.mark('qRAM')
+            load_unary(qc, r_address, r_isoff, is_off, r_ancilla)
             qc.barrier()
         
-        
+        ledger.mark('push')
         for i, q_ispush in enumerate(r_ispush):
             for j in push[i]:
-                qc.mcx([q_ispush], r_isoff[j], r_ancilla, mode = 'basic')
+                auto_mcx(qc, [q_ispush], r_isoff[j], clean=r_ancilla)
         qc.barrier()
         
-        qc.mcx([*r_isoff],*r_oracle, r_ancilla ,mode = 'basic')
+        ledger.mark('board oracle')
+        auto_mcx(qc, r_isoff, r_oracle[0], clean=r_ancilla)
         qc.barrier()
 
+        ledger.mark('push')
         for i, q_ispush in enumerate(r_ispush):
             for j in push[i]:
-                qc.mcx([q_ispush], r_isoff[j], r_ancilla, mode = 'basic')
+                auto_mcx(qc, [q_ispush], r_isoff[j], clean=r_ancilla)
         qc.barrier()
         '''
         if it == Grover_nit - 1:
@@ -293,70 +287,29 @@ def week2b_ans_func(lightout4):
                         qc.x(r_address[i_address])
             qc.barrier()
         '''
+        ledger.mark('push diffusion')
         qc.h(r_ispush)
         qc.x(r_ispush)
         qc.h(r_ispush[-1])
-        qc.mcx([*r_ispush[:nlight-1]], r_ispush[-1], r_ancilla, mode = 'basic')
+        auto_mcx(qc, r_ispush[:nlight-1], r_ispush[-1], clean=r_ancilla)
         qc.h(r_ispush[-1])
         qc.x(r_ispush)
         qc.h(r_ispush)
         qc.barrier() 
 
-    for q_ispush in r_ispush:
-        ctr = [q_ispush]
-        for i_ancilla in range(4):
-            qc.mcx(ctr, r_ancilla[i_ancilla])
-            qc.x(r_ancilla[i_ancilla])
-            ctr.append(r_ancilla[i_ancilla])
-        qc.x(r_ancilla[0:4])
-        qc.barrier()
-    
     ##### Oracle ##################################################################################  
-    # 3 push
-    qc.x(r_ancilla[2])
-    qc.x(r_ancilla[3]) 
-    qc.mcx([*r_ancilla[0:4]], r_oracle)
-    #qc.x(r_ancilla[2])
-    #qc.x(r_ancilla[3])
-    qc.barrier()
-    
-    # 2 push
-    qc.x(r_ancilla[0])
-    #qc.x(r_ancilla[2])
-    #qc.x(r_ancilla[3])
-    qc.mcx([*r_ancilla[0:4]], r_oracle)
-    qc.x(r_ancilla[0])
-    #qc.x(r_ancilla[2])
-    #qc.x(r_ancilla[3])
+    # WEEK2B_MIN_PUSH..WEEK2B_MAX_PUSH pushes: popcount of is_push on the ancillas (cheapest construction that fits)
+    ledger.mark('push count')
+    in_range(qc, r_ispush, r_oracle[0], WEEK2B_MIN_PUSH, WEEK2B_MAX_PUSH, r_ancilla)
     qc.barrier()
-         
-    # 1 push
-    qc.x(r_ancilla[1])
-    #qc.x(r_ancilla[2])
-    #qc.x(r_ancilla[3])
-    qc.mcx([*r_ancilla[0:4]], r_oracle)
-    qc.x(r_ancilla[1])
-    qc.x(r_ancilla[2])
-    qc.x(r_ancilla[3])
-
-    qc.barrier()
-
-    #### qRAM #####################################################################################
-    for q_ispush in reversed(r_ispush):
-        ctr = [q_ispush, *r_ancilla[0:3]]
-        qc.x(r_ancilla[0:4])
-        for i_ancilla in reversed(range(4)):
-            qc.x(r_ancilla[i_ancilla])
-            qc.mcx(ctr, r_ancilla[i_ancilla])
-            ctr.pop(-1)
-        qc.barrier()
 
     for it in range(Grover_nit):
         
+        ledger.mark('push diffusion')
         qc.h(r_ispush)
         qc.x(r_ispush)
         qc.h(r_ispush[-1])
-        qc.mcx([*r_ispush[:nlight-1]], r_ispush[-1], r_ancilla, mode = 'basic')
+        auto_mcx(qc, r_ispush[:nlight-1], r_ispush[-1], clean=r_ancilla)
         qc.h(r_ispush[-1])
         qc.x(r_ispush)
         qc.h(r_ispush)
@@ -377,54 +330,52 @@ def week2b_ans_func(lightout4):
         qc.barrier()
         '''
         
+        ledger.mark('push')
         for i, q_ispush in enumerate(r_ispush):
             for j in push[i]:
-                qc.mcx([q_ispush], r_isoff[j], r_ancilla, mode = 'basic')
+                auto_mcx(qc, [q_ispush], r_isoff[j], clean=r_ancilla)
         qc.barrier()
         
-        qc.mcx([*r_isoff],*r_oracle, r_ancilla, mode = 'basic')
+        ledger.mark('board oracle')
+        auto_mcx(qc, r_isoff, r_oracle[0], clean=r_ancilla)
         qc.barrier()
 
+        ledger.mark('push')
         for i, q_ispush in enumerate(r_ispush):
             for j in push[i]:
-                qc.mcx([q_ispush], r_isoff[j], r_ancilla, mode = 'basic')
+                auto_mcx(qc, [q_ispush], r_isoff[j], clean=r_ancilla)
         qc.barrier()
 
         if it == Grover_nit - 1:
-            for i_board in reversed(range(nboard)):
-                for i_address in range(naddress):
-                    if( not (i_board >> i_address & 1)):
-                        qc.x(r_address[i_address])
-                for i, light in enumerate(lightout4[i_board]):
-                    if(not light):
-                        qc.mcx(r_address,r_isoff[i], r_ancilla, mode = 'basic')
-                for i_address in range(naddress):
-                    if( not (i_board >> i_address & 1)):
-                        qc.x(r_address[i_address])
+            ledger.mark('qRAM')
+            load_unary(qc, r_address, r_isoff, is_off, r_ancilla)
             qc.barrier()
         
+    ledger.mark('init')
     qc.x(r_oracle)
     qc.h(r_ispush)
     qc.barrier()
     
     #### defusion #################################################################################
+    ledger.mark('address diffusion')
     if(not debug):
         qc.h(r_address)
         qc.x(r_address)
         qc.h(r_address[-1])
-        qc.mcx(r_address[0:-1], r_address[-1], r_ancilla, mode = 'basic')
+        auto_mcx(qc, r_address[0:-1], r_address[-1], clean=r_ancilla)
         qc.h(r_address[-1])
         qc.x(r_address)
         qc.h(r_address)
         qc.barrier()
     
     #### measure ##################################################################################
+    ledger.mark('measure')
     qc.measure(r_address, c_measure)
     if(debug):
         qc.measure(r_isoff, c_measure2)
         qc.measure(r_ispush, c_measure3)
         qc.measure(r_ancilla, c_measure4)
-        qc.measure(r_flag, c_measure5)
+        qc.measure(r_oracle, c_measure5)
         
     ###############################################################################################
     return qc
@@ -433,8 +384,36 @@ def week2b_ans_func(lightout4):
 # qc.draw()
 
 
+# %%
+# Cost per section, counted while the circuit is built (no unrolling).
+ledger = CostLedger()
+qc = week2b_ans_func(lightsout4, ledger)
+print(ledger.report())
+
+# %%
+# is_off and ancilla must be back at |0> on every path (address x push inputs, random H branches).
+from uncompute import verify_clean
+regs = {r.name: r for r in qc.qregs}
+verify_clean(qc, regs['is_off'][:] + regs['ancilla'][:], search=regs['address'][:] + regs['is_push'][:])
+
+# %%
+# Model of the circuit above on the address x push amplitudes only, with the builder's nit and push range.
+from grover_sim import simulate_week2b, top_address
+top_address(simulate_week2b(lightsout4))
+
+
+# %%
+# Fuzz with random 4-board sets (one board clears in 1-3 pushes): failure rate, top-count margin, cost spread.
+# A quick run by default; set full_fuzz = True for 1000 inputs (minutes to hours of simulation).
+from fuzz import NINPUT, fuzz, report
+full_fuzz = False
+print(report(fuzz('ex2b', week2b_ans_func, ninput=1000 if full_fuzz else NINPUT)))
+
+
 # %%
 # Submission code
+# Offline, same calls (local simulator, random validation inputs):
+# from local_grader import prepare_ex2b, grade_ex2b, submit_ex2b
 from qc_grader import prepare_ex2b, grade_ex2b, submit_ex2b
 
 # Execute your circuit with following prepare_ex2b() function.
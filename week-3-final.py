@@ -77,6 +77,13 @@ problem_set =     [[['0', '2'], ['1', '0'], ['1', '2'], ['1', '3'], ['2', '0'],
     [['0', '2'], ['0', '3'], ['1', '2'], ['2', '3'], ['3', '0'], ['3', '1']],
     [['0', '1'], ['1', '0'], ['1', '2'], ['2', '2'], ['3', '0'], ['3', '1']]]
 
+# %%
+# Classical reference to check the circuit's output against (not for the oracle):
+# fewest beams per board = maximum row/column matching (König's theorem).
+from asteroids import false_board, min_beams_many
+print(min_beams_many(problem_set))
+print('false board:', false_board(problem_set))
+
 # %% [markdown]
 # Answer by creating a quantum circuit to solve the puzzle shown with the problem set above. In the quantum circuit to be submitted, measure **only the `solution` (4bit)** that solves the puzzle. <br/>
 # To submit your solution, create a function that takes `problem_set` as an input and then returns a  `QuantumCircuit`.  You can name the function as you like. Make sure it works even with another dataset of "problem_set". We will validate your circuit with different inputs.<br/>
@@ -99,6 +106,16 @@ problem_set =     [[['0', '2'], ['1', '0'], ['1', '2'], ['1', '3'], ['2', '0'],
 # - Top 10 participants will be recognized and asked to submit a write up on how they solved the exercise.
 
 # %%
+# Search the oracle constructions: exact cost of every option set, local simulation of the cheapest
+# ones on random problem sets, Pareto front of cost vs qubits vs success margin (about a minute).
+from oracle_search import cheapest, report, search
+oracle_search_result = search(problem_set, seed=2020)
+print(report(oracle_search_result))
+print(cheapest(oracle_search_result))
+
+# %%
+from asteroids_circuits import build_week3
+
 def week3_ans_func(problem_set):
     ##### build your quantum circuit here
     ##### In addition, please make it a function that can solve the problem even with different inputs (problem_set). We do validation with different inputs. 
@@ -107,12 +124,17 @@ def week3_ans_func(problem_set):
     #### for i in range(1):
     ####   oracle()
     ####   diffusion()
+    # qRAM of the 16 cells, phase polynomial of "needs 4 beams" (exact up to 6 asteroids) on 3
+    # shared-product ancillas: the cheapest correct construction found by oracle_search above.
+    qc = build_week3(problem_set, loader='unary', degree=6, kickback='phase', nfactor=3, nancilla=3)
     
     return qc
 
 
 # %%
 # Submission code
+# Offline, same calls (local simulator, random validation inputs):
+# from local_grader import grade_ex3, prepare_ex3, submit_ex3
 from qc_grader import grade_ex3, prepare_ex3, submit_ex3
 
 # Execute your circuit with following prepare_ex3() function.